@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for prom's hot paths
+
+These aren't tests, they time things like query rendering, hydration, saving,
+and iterating so regressions in prom.query, prom.model, and
+prom.interface.sql can be caught before a release
+
+:example:
+    # run everything against an in-memory SQLite db
+    $ python -m benchmarks
+
+    # also run against Postgres, any PROM_BENCH_DSN or PROM_BENCH_DSN_N
+    # environment variables are used in addition to any --dsn flags
+    $ export PROM_BENCH_DSN=postgres://user:pw@localhost/db
+    $ python -m benchmarks --dsn "sqlite://:memory:"
+
+    # save a baseline, make changes, then compare against the baseline, this
+    # will exit with a non-zero code if anything got slower than --threshold
+    $ python -m benchmarks --output before.json
+    $ python -m benchmarks --compare before.json
+
+    # only run some of the benchmarks
+    $ python -m benchmarks --filter "model.*"
+"""
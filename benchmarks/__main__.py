@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+import argparse
+import asyncio
+import datetime
+import fnmatch
+import json
+import platform
+import sys
+
+import prom
+
+from .base import (
+    Benchmark,
+    Environment,
+    find_dsns,
+    run_benchmark,
+    compare,
+)
+from . import cases # registers the benchmark classes
+
+
+def echo(msg=""):
+    """All the human readable output goes to stderr so stdout can be used for
+    the json output"""
+    print(msg, file=sys.stderr)
+
+
+def format_time(seconds):
+    for unit, multiplier in [("s", 1), ("ms", 1e3), ("us", 1e6)]:
+        if seconds * multiplier >= 1:
+            return f"{seconds * multiplier:.2f} {unit}"
+    return f"{seconds * 1e9:.0f} ns"
+
+
+async def run(args):
+    benchmark_classes = []
+    for name, benchmark_class in Benchmark.benchmark_classes.items():
+        if args.filter:
+            if not any(fnmatch.fnmatch(name, f) for f in args.filter):
+                continue
+
+        benchmark_classes.append(benchmark_class)
+
+    results = []
+    for i, dsn in enumerate(find_dsns(args.dsn)):
+        try:
+            environment = Environment(dsn, f"prom_bench_{i}")
+            await environment.setup()
+
+        except Exception as e:
+            # Postgres might not be running or psycopg might not be installed,
+            # only the scheme is printed so passwords don't end up in logs
+            scheme = dsn.split(":", 1)[0]
+            echo(f"Skipping {scheme} dsn: {e!r}")
+            continue
+
+        echo(f"{environment.interface_name}")
+        try:
+            for benchmark_class in benchmark_classes:
+                r = await run_benchmark(
+                    benchmark_class(environment),
+                    repeat=args.repeat,
+                )
+                results.append(r)
+                echo(
+                    f"  {r['name']:<24} {format_time(r['min']):>12}"
+                    f" (median {format_time(r['median'])})"
+                )
+
+        finally:
+            await environment.teardown()
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Time prom's hot paths",
+    )
+    parser.add_argument(
+        "--dsn",
+        action="append",
+        default=[],
+        help=(
+            "A prom dsn to run the benchmarks against, can be passed multiple"
+            " times. PROM_BENCH_DSN environment variables are also used and"
+            " an in-memory SQLite db is used if there aren't any"
+        ),
+    )
+    parser.add_argument(
+        "--filter", "-f",
+        action="append",
+        default=[],
+        help="Only run benchmarks whose name matches this glob",
+    )
+    parser.add_argument(
+        "--repeat", "-r",
+        type=int,
+        default=5,
+        help="How many timings to take of each benchmark",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        help="Write the json results to this path, use - for stdout",
+    )
+    parser.add_argument(
+        "--compare", "-c",
+        help="Compare the results against the json results at this path",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help=(
+            "When comparing, how much slower a benchmark can get before it is"
+            " a regression, 0.1 is 10%%"
+        ),
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    output = {
+        "created": datetime.datetime.now(datetime.UTC).isoformat(),
+        "prom": prom.__version__,
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+    if args.output:
+        if args.output == "-":
+            json.dump(output, sys.stdout, indent=2)
+            sys.stdout.write("\n")
+
+        else:
+            with open(args.output, "w") as fp:
+                json.dump(output, fp, indent=2)
+
+    ret = 0
+    if args.compare:
+        with open(args.compare) as fp:
+            baseline = json.load(fp)
+
+        echo()
+        echo(f"Compared to {args.compare} (prom {baseline['prom']})")
+        for c in compare(baseline["results"], results, args.threshold):
+            flag = "REGRESSION" if c["regression"] else ""
+            echo(
+                f"  {c['interface']:<10} {c['name']:<24}"
+                f" {format_time(c['baseline']):>12} ->"
+                f" {format_time(c['current']):>12}"
+                f" {c['change']:>+8.1%} {flag}"
+            )
+            if c["regression"]:
+                ret = 1
+
+    return ret
+
+
+if __name__ == "__main__":
+    sys.exit(main())
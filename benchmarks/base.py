@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+import inspect
+import os
+import statistics
+import time
+
+import dsnparse
+
+from prom import Orm, Field
+from prom.config import DsnConnection
+from prom.interface import set_interface
+
+
+class Environment(object):
+    """Holds the interface and the orm classes the benchmarks run against
+
+    Every dsn gets its own environment, the orm classes are created fresh for
+    each environment so they use that environment's interface
+    """
+    def __init__(self, dsn, connection_name):
+        """
+        :param dsn: str, the prom dsn of the db the benchmarks will use
+        :param connection_name: str, the name the interface will be set under
+        """
+        connection = dsnparse.parse(dsn, parse_class=DsnConnection)
+        self.connection = connection
+        self.connection_name = connection_name
+        self.interface = connection.interface
+        self.interface_name = self.interface.__class__.__name__
+
+    async def setup(self):
+        set_interface(self.interface, self.connection_name)
+
+        class BenchFoo(Orm):
+            table_name = "prom_bench_foo"
+            connection_name = self.connection_name
+
+            name = Field(str)
+            count = Field(int)
+            score = Field(float, False)
+            active = Field(bool, False, default=True)
+
+        class BenchBar(Orm):
+            table_name = "prom_bench_bar"
+            connection_name = self.connection_name
+
+            bench_foo_id = Field(BenchFoo, True)
+            title = Field(str)
+
+        self.foo_class = BenchFoo
+        self.bar_class = BenchBar
+        self.orm_classes = [BenchFoo, BenchBar]
+
+        # we start from empty tables in case a previous run didn't clean up
+        await self.teardown_tables()
+        for orm_class in self.orm_classes:
+            await orm_class.install()
+
+    async def teardown_tables(self):
+        for orm_class in reversed(self.orm_classes):
+            await self.interface.unsafe_delete_table(orm_class.schema)
+
+    async def teardown(self):
+        try:
+            await self.teardown_tables()
+
+        finally:
+            await self.interface.close()
+
+    async def create_foos(self, count):
+        """Insert count foo rows
+
+        :returns: list[BenchFoo]
+        """
+        foos = []
+        for i in range(count):
+            foo = self.foo_class(
+                name=f"foo {i}",
+                count=i,
+                score=i / 3,
+            )
+            await foo.save()
+            foos.append(foo)
+        return foos
+
+
+class Benchmark(object):
+    """Base class for a benchmark case, any child class that sets .name will
+    be automatically added to .benchmark_classes
+
+    The child class should override .run, which will be called .number times
+    for each of the runner's repeats. .run can be a normal method or an async
+    method
+    """
+    name = ""
+    """str -- the benchmark's name, this is used in output and comparisons"""
+
+    number = 100
+    """int -- how many times .run is called for each timing"""
+
+    benchmark_classes = {}
+    """dict -- holds all the benchmark child classes, name is the key"""
+
+    def __init_subclass__(cls):
+        if cls.name:
+            Benchmark.benchmark_classes[cls.name] = cls
+
+    def __init__(self, environment):
+        self.environment = environment
+
+    async def setup(self):
+        """Anything that shouldn't be timed goes here"""
+        pass
+
+    async def teardown(self):
+        pass
+
+    def run(self):
+        raise NotImplementedError()
+
+
+def find_dsns(dsns, dsn_env_name="PROM_BENCH_DSN"):
+    """Returns dsns plus any dsns found in the environment, if there aren't
+    any then an in-memory SQLite dsn is returned
+
+    This doesn't parse the dsns because parsing imports the interface and
+    we want an interface that isn't installed (eg, psycopg) to be skipped
+    instead of failing the whole run
+
+    :param dsns: list[str]
+    :param dsn_env_name: str, the environment variable name, this will also
+        check <dsn_env_name>_N where N starts at 1
+    :returns: list[str]
+    """
+    dsns = list(dsns)
+
+    if dsn := os.environ.get(dsn_env_name, ""):
+        dsns.append(dsn)
+
+    i = 1
+    while dsn := os.environ.get(f"{dsn_env_name}_{i}", ""):
+        dsns.append(dsn)
+        i += 1
+
+    return dsns or ["sqlite://:memory:"]
+
+
+async def run_benchmark(benchmark, repeat=5):
+    """Time benchmark
+
+    :param benchmark: Benchmark
+    :param repeat: int, how many timings to take
+    :returns: dict, the result, all times are seconds per .run call
+    """
+    await benchmark.setup()
+    try:
+        number = benchmark.number
+        is_async = inspect.iscoroutinefunction(benchmark.run)
+
+        # warm up any caches before we start timing
+        if is_async:
+            await benchmark.run()
+
+        else:
+            benchmark.run()
+
+        timings = []
+        for _ in range(repeat):
+            if is_async:
+                start = time.perf_counter()
+                for _ in range(number):
+                    await benchmark.run()
+                stop = time.perf_counter()
+
+            else:
+                start = time.perf_counter()
+                for _ in range(number):
+                    benchmark.run()
+                stop = time.perf_counter()
+
+            timings.append((stop - start) / number)
+
+    finally:
+        await benchmark.teardown()
+
+    return {
+        "name": benchmark.name,
+        "interface": benchmark.environment.interface_name,
+        "number": number,
+        "repeat": repeat,
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "mean": statistics.mean(timings),
+        "ops": 1.0 / min(timings),
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """Compare the results of two runs
+
+    The min timings are compared since they are the least noisy
+
+    :param baseline: list[dict], results from a previous run
+    :param current: list[dict], results from this run
+    :param threshold: float, how much slower (eg, 0.1 is 10%) a benchmark
+        can get before it is considered a regression
+    :returns: list[dict], one comparison for each result in current that is
+        also in baseline
+    """
+    baseline = {(r["interface"], r["name"]): r for r in baseline}
+
+    comparisons = []
+    for r in current:
+        if br := baseline.get((r["interface"], r["name"])):
+            change = (r["min"] - br["min"]) / br["min"]
+            comparisons.append({
+                "name": r["name"],
+                "interface": r["interface"],
+                "baseline": br["min"],
+                "current": r["min"],
+                "change": change,
+                "regression": change > threshold,
+            })
+
+    return comparisons
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+"""
+The benchmark cases, add new cases by extending Benchmark and setting a
+unique .name
+"""
+from .base import Benchmark
+
+
+def create_query(environment):
+    """Returns a query that touches most of the clauses"""
+    q = environment.foo_class.query
+    q.select_name().select_count()
+    q.eq_active(True).in_name(["foo 1", "foo 2", "foo 3"]).gte_score(0.5)
+    q.desc_count().limit(10).page(2)
+    return q
+
+
+class QueryBuild(Benchmark):
+    """Create a query with the fluid interface"""
+    name = "query.build"
+    number = 2000
+
+    def run(self):
+        return create_query(self.environment)
+
+
+class QueryRender(Benchmark):
+    """Render an already built query to its SQL string"""
+    name = "query.render"
+    number = 2000
+
+    async def setup(self):
+        self.query = create_query(self.environment)
+
+    def run(self):
+        return self.query.render()
+
+
+class QueryCopy(Benchmark):
+    name = "query.copy"
+    number = 2000
+
+    async def setup(self):
+        self.query = create_query(self.environment)
+
+    def run(self):
+        return self.query.copy()
+
+
+class ModelHydrate(Benchmark):
+    """Create an orm instance from a db row, this is what happens for every
+    row when iterating a query"""
+    name = "model.hydrate"
+    number = 2000
+
+    async def setup(self):
+        foo_class = self.environment.foo_class
+        await self.environment.create_foos(1)
+        cursor = await foo_class.interface.get(
+            foo_class.schema,
+            foo_class.query.limit(1),
+        )
+        self.row = cursor[0]
+
+    def run(self):
+        return self.environment.foo_class.from_query(self.row)
+
+
+class ModelJsonable(Benchmark):
+    name = "model.jsonable"
+    number = 2000
+
+    async def setup(self):
+        self.foo = (await self.environment.create_foos(1))[0]
+
+    def run(self):
+        return self.foo.jsonable()
+
+
+class ModelSaveInsert(Benchmark):
+    name = "model.save.insert"
+    number = 200
+
+    async def run(self):
+        foo = self.environment.foo_class(name="foo", count=1, score=0.5)
+        await foo.save()
+
+
+class ModelSaveUpdate(Benchmark):
+    name = "model.save.update"
+    number = 200
+
+    async def setup(self):
+        self.foo = (await self.environment.create_foos(1))[0]
+
+    async def run(self):
+        self.foo.count += 1
+        await self.foo.save()
+
+
+class IteratorGet(Benchmark):
+    """Iterate through 1000 hydrated rows, the timing is for all 1000"""
+    name = "iterator.get_1000"
+    number = 5
+
+    async def setup(self):
+        await self.environment.interface.unsafe_clear_table(
+            self.environment.foo_class.schema,
+        )
+        await self.environment.create_foos(1000)
+
+    async def run(self):
+        async for foo in await self.environment.foo_class.query.get():
+            pass
+
+
+class RelationshipRef(Benchmark):
+    """Load the orm a foreign key points to (eg, bar.foo)"""
+    name = "relationship.ref"
+    number = 200
+
+    async def setup(self):
+        foo = (await self.environment.create_foos(1))[0]
+        self.bar = self.environment.bar_class(
+            bench_foo_id=foo.pk,
+            title="bar",
+        )
+        await self.bar.save()
+
+    async def run(self):
+        return await self.bar.bench_foo
+
+
+class RelationshipDep(Benchmark):
+    """Load all the orms that have a foreign key to an orm (eg, foo.bars)"""
+    name = "relationship.dep"
+    number = 200
+
+    async def setup(self):
+        self.foo = (await self.environment.create_foos(1))[0]
+        for i in range(10):
+            bar = self.environment.bar_class(
+                bench_foo_id=self.foo.pk,
+                title=f"bar {i}",
+            )
+            await bar.save()
+
+    async def run(self):
+        return await (await self.foo.bench_bars).tolist()
+
+
+class IteratorBatches(Benchmark):
+    """Iterate through 1000 hydrated rows a batch at a time, the timing is
+    for all 1000"""
+    name = "iterator.batches_1000"
+    number = 5
+
+    async def setup(self):
+        await self.environment.interface.unsafe_clear_table(
+            self.environment.foo_class.schema,
+        )
+        await self.environment.create_foos(1000)
+
+    async def run(self):
+        iterator = await self.environment.foo_class.query.get()
+        async for foos in iterator.batches():
+            pass
@@ -6,6 +6,7 @@ import json
 import logging
 import uuid
 import enum
+from types import MappingProxyType
 from typing import Any, Self
 from dataclasses import MISSING, _MISSING_TYPE
 
@@ -59,6 +60,10 @@ class Connection(object):
     readonly = False
     """Set to true to make the connection readonly"""
 
+    replica = False
+    """Set to true to make the connection a read replica of the connection
+    with the same name, see Interface.add_replica"""
+
     options = None
     """any other db options, these can be interface implementation specific"""
 
@@ -164,7 +169,8 @@ class DsnConnection(Connection):
         d["database"] = parser.database
         d["options"] = d.pop("query_params", {})
         d["host"] = d.pop("hostname")
-        d["readonly"] = bool(d["options"].pop("readonly", self.readonly))
+        d["replica"] = bool(d["options"].pop("replica", self.replica))
+        d["readonly"] = bool(d["options"].pop("readonly", d["replica"]))
 
         # get rid of certain values
         d.pop("params", None)
@@ -189,6 +195,33 @@ class DsnConnection(Connection):
         return ret
 
 
+class schemaview(object):
+    """Internal decorator for Schema properties that are derived from the
+    schema's fields
+
+    These properties are accessed for every row that is hydrated or saved so
+    the computed value is cached in Schema.lookup["views"] until a field or
+    index is set on the schema. Because the value is shared the property
+    should return an immutable value (eg, a tuple or MappingProxyType)
+    """
+    def __init__(self, fget):
+        self.fget = fget
+        self.name = fget.__name__
+        self.__doc__ = fget.__doc__
+
+    def __get__(self, schema, schema_class=None):
+        if schema is None:
+            return self
+
+        views = schema.lookup["views"]
+        try:
+            return views[self.name]
+
+        except KeyError:
+            ret = views[self.name] = self.fget(schema)
+            return ret
+
+
 class Schema(object):
     """
     handles all table schema definition
@@ -208,41 +241,51 @@ class Schema(object):
     lookup = None
     """dict -- field information lookup table, basically an internal cache"""
 
-    @property
+    @schemaview
     def normal_fields(self):
         """fields that aren't magic (eg, don't start with an underscore)"""
-        return {f:v for f, v in self.fields.items() if not f.startswith("_")}
+        return MappingProxyType({
+            f:v for f, v in self.fields.items() if not f.startswith("_")
+        })
 
-    @property
+    @schemaview
     def required_fields(self):
         """The normal required fields (eg, no magic fields like _id are
         included)
         """
-        return {f:v for f, v in self.normal_fields.items() if v.is_required()}
+        return MappingProxyType({
+            f:v for f, v in self.normal_fields.items() if v.is_required()
+        })
 
-    @property
+    @schemaview
     def persisted_fields(self):
         """The fields that should be saved in the db"""
-        return {f:v for f, v in self.fields.items() if v.is_persisted()}
+        return MappingProxyType({
+            f:v for f, v in self.fields.items() if v.is_persisted()
+        })
 
-    @property
+    @schemaview
     def ref_fields(self):
         """Return FK reference fields"""
-        return {f:v for f, v in self.normal_fields.items() if v.is_ref()}
+        return MappingProxyType({
+            f:v for f, v in self.normal_fields.items() if v.is_ref()
+        })
 
-    @property
+    @schemaview
     def magic_fields(self):
         """the magic fields for the schema, magic fields start with an
         underscore
         """
-        return {f:v for f, v in self.fields.items() if f.startswith("_")}
+        return MappingProxyType({
+            f:v for f, v in self.fields.items() if f.startswith("_")
+        })
 
-    @property
+    @schemaview
     def pk_fields(self):
         pk_fields = {}
         for pk_name in self.pk_names:
             pk_fields[pk_name] = self.fields[pk_name]
-        return pk_fields
+        return MappingProxyType(pk_fields)
 
     @property
     def pk_name(self):
@@ -256,20 +299,24 @@ class Schema(object):
 
         return pk_name
 
-    @property
+    @schemaview
     def pk_names(self):
-        """Returns all the field names comprising the primary key as a list"""
+        """Returns all the field names comprising the primary key as a tuple"""
         pk_name = self.pk_name
-        return [pk_name] if pk_name else []
+        return (pk_name,) if pk_name else ()
 
-    @property
+    @schemaview
     def schemas(self):
         """Find and return all the schemas that are needed for this schema to 
         install successfully
 
         Another way to put this is all the schemas this Schema touches
 
-        :returns: list, a list of Schema instances, self will be at the end
+        NOTE -- this is only invalidated when this schema changes, if a
+        referenced schema gets a new ref field after this has been computed
+        it won't be reflected here
+
+        :returns: tuple, a tuple of Schema instances, self will be at the end
         """
         schemas = []
         for f in self.fields.values():
@@ -277,7 +324,7 @@ class Schema(object):
                 schemas.extend(s.schemas)
         schemas.append(self)
 
-        return schemas
+        return tuple(schemas)
 
     def __init__(self, table_name, orm_class=None, **fields_or_indexes):
         """Create an instance
@@ -307,6 +354,12 @@ class Schema(object):
             # classes. Basically, if a parent class sets foo and then a child
             # class later on sets foo = None then foo.names will be here
             "field_names_deleted": {},
+            # holds the computed values of the @schemaview properties, this is
+            # cleared anytime a field or index is set
+            "views": {},
+            # holds the Orm method names that resolved an attribute in
+            # Orm.__getattr__, this is cleared anytime a field is set
+            "getattr": {},
         }
 
         for name, val in fields_or_indexes.items():
@@ -369,6 +422,8 @@ class Schema(object):
             raise ValueError(f"{type(field)} is not a Field instance")
 
         field.__set_name__(self.orm_class, field_name)
+        self.lookup["views"].clear()
+        self.lookup["getattr"].clear()
 
         if field.unique:
             self.set_index(field_name, Index(field_name, unique=True))
@@ -425,6 +480,7 @@ class Schema(object):
 
         index.name = index_name
         index.orm_class = self.orm_class
+        self.lookup["views"].clear()
 
         self.indexes[index_name] = index
         return self
@@ -472,6 +528,43 @@ class Schema(object):
 
         raise AttributeError(field_name)
 
+    def values_key(self, field_names, fields) -> tuple:
+        """Returns a hashable key of the field_names values in fields that is
+        the same whether fields came from the db or was going to the db
+
+        The db can send back a different type than what was sent to it (eg,
+        a str for a UUID, or json text for a dict) so the values are passed
+        through Field.from_interface, if the schema has an orm, and then
+        normalized
+
+        :param field_names: Sequence[str]
+        :param fields: Mapping, the interface fields
+        :returns: tuple
+        """
+        key = []
+        for field_name in field_names:
+            val = fields[field_name]
+            if self.orm_class:
+                val = self.fields[field_name].from_interface(None, val)
+
+            if isinstance(val, (dict, list)):
+                val = json.dumps(val, sort_keys=True, default=str)
+
+            elif isinstance(val, datetime.datetime):
+                if val.tzinfo:
+                    val = val.astimezone(datetime.timezone.utc)
+                    val = val.replace(tzinfo=None)
+                # datatypes.Datetime.isoformat adds a Z
+                val = datetime.datetime.isoformat(val)
+
+            elif not isinstance(val, (int, float, decimal.Decimal)):
+                if val is not None:
+                    val = String(val)
+
+            key.append(val)
+
+        return tuple(key)
+
 
 class Index(object):
     """Each index on the table is configured using this class
@@ -480,9 +573,19 @@ class Index(object):
         """initialize an index
 
         :param *field_names: the string field names this index will index on,
-            fields have to be already added to this schema index
+            fields have to be already added to this schema index, a field
+            name can also be an expression using function syntax
+            (eg, "lower(email)")
         :param **options:
             - unique: bool, True if the index should be unique, false otherwise
+            - where: Query, only rows matching the query's where clause will
+                be in the index (a partial index)
+            - include: list[str], extra fields stored in the index so
+                selecting them can be answered from the index (a covering
+                index), only Postgres supports this natively
+            - concurrently: bool, True if the index should be built without
+                blocking writes to the table, this is only supported by
+                Postgres, other interfaces will create the index normally
         """
         if not field_names:
             raise ValueError("field_names list is empty")
@@ -491,6 +594,7 @@ class Index(object):
         self.field_names = list(map(String, field_names))
         self.options = options
         self.unique = options.get("unique", False)
+        self.where = options.get("where", None)
 
 
 class Field(object):
@@ -1314,8 +1418,11 @@ class Field(object):
         :param val: mixed, the current value of the field
         :returns: mixed
         """
-        orm_class = orm.__class__ if orm else self.orm_class
-        logger.debug(f"{orm_class.__name__}.{self.name}.to_value")
+        # the lifecycle methods are called for every field of every row, so
+        # we only do the logging work if it is actually going to be logged
+        if logger.isEnabledFor(logging.DEBUG):
+            orm_class = orm.__class__ if orm else self.orm_class
+            logger.debug("%s.%s.to_value", orm_class.__name__, self.name)
 
         val = self.fset(orm, val)
 
@@ -1336,7 +1443,12 @@ class Field(object):
         fetched from the instance, this is a little different than Python's
         built-in @property fget method because it will pull the value from a
         shadow variable in the instance and then call fget"""
-        logger.debug(f"{orm.__class__.__name__}.{self.name}.from_value")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "%s.%s.from_value",
+                orm.__class__.__name__,
+                self.name,
+            )
 
         val = self.fget(orm, val)
 
@@ -1348,8 +1460,9 @@ class Field(object):
 
     def del_value(self, orm, val):
         """Internal wrapper method for `.fdel`"""
-        orm_class = orm.__class__ if orm else self.orm_class
-        logger.debug(f"{orm_class.__name__}.{self.name}.del_value")
+        if logger.isEnabledFor(logging.DEBUG):
+            orm_class = orm.__class__ if orm else self.orm_class
+            logger.debug("%s.%s.del_value", orm_class.__name__, self.name)
 
         val = self.fdel(orm, val)
 
@@ -1437,8 +1550,9 @@ class Field(object):
         :param val: Any, the current value of the field
         :returns: Any
         """
-        orm_class = orm.__class__ if orm else self.orm_class
-        logger.debug(f"{orm_class.__name__}.{self.name}.to_interface")
+        if logger.isEnabledFor(logging.DEBUG):
+            orm_class = orm.__class__ if orm else self.orm_class
+            logger.debug("%s.%s.to_interface", orm_class.__name__, self.name)
 
         val = self.iset(orm, val)
 
@@ -1467,8 +1581,9 @@ class Field(object):
         :param val: mixed, the current value of the field
         :returns: mixed
         """
-        orm_class = orm.__class__ if orm else self.orm_class
-        logger.debug(f"{orm_class.__name__}.{self.name}.from_interface")
+        if logger.isEnabledFor(logging.DEBUG):
+            orm_class = orm.__class__ if orm else self.orm_class
+            logger.debug("%s.%s.from_interface", orm_class.__name__, self.name)
 
         val = self.iget(orm, val)
 
@@ -1500,8 +1615,9 @@ class Field(object):
         :param val: mixed, the current value of the field
         :returns: mixed
         """
-        orm_class = orm.__class__ if orm else self.orm_class
-        logger.debug(f"{orm_class.__name__}.{self.name}.del_interface")
+        if logger.isEnabledFor(logging.DEBUG):
+            orm_class = orm.__class__ if orm else self.orm_class
+            logger.debug("%s.%s.del_interface", orm_class.__name__, self.name)
         orm.__dict__.pop(self.orm_interface_hash, None)
         return None if self.is_pk() else val
 
@@ -1600,8 +1716,9 @@ class Field(object):
         :returns: tuple[str, Any], (name, val) where the name will be the
             jsonable field name and the value will be the jsonable value
         """
-        orm_class = orm.__class__ if orm else self.orm_class
-        logger.debug(f"{orm_class.__name__}.{self.name}.jsonable")
+        if logger.isEnabledFor(logging.DEBUG):
+            orm_class = orm.__class__ if orm else self.orm_class
+            logger.debug("%s.%s.jsonable", orm_class.__name__, self.name)
 
         if self.is_jsonable():
             if self.is_ref():
@@ -333,13 +333,23 @@ class ModelData(TestData):
             Orm.orm_classes.insert_modules(modpaths)
 
         # now go through all the orm classes that have been loaded and install
-        # them
+        # them, all the tables of an interface are installed together
         seen_table_names = set()
+        interface_schemas = {}
         for orm_class in Orm.orm_classes.get_abs_classes():
             for s in orm_class.schema.schemas:
                 if s.table_name not in seen_table_names:
-                    await s.orm_class.install()
                     seen_table_names.add(s.table_name)
+                    if s.orm_class.install.__func__ is Orm.install.__func__:
+                        interface = s.orm_class.interface
+                        interface_schemas.setdefault(interface, []).append(s)
+
+                    else:
+                        # respect any customized install
+                        await s.orm_class.install()
+
+        for interface, schemas in interface_schemas.items():
+            await interface.set_tables(schemas)
 
     async def unsafe_reset_orms(self, modpaths=None):
         """Delete all the tables in the db and then load all the Orm child
@@ -627,8 +637,9 @@ class ModelData(TestData):
             self.get_orms,
             **kwargs
         )
-        for instance in instances:
-            await instance.save(nest=True)
+        async with orm_class.interface.pipeline():
+            for instance in instances:
+                await instance.save(nest=True)
         return instances
 
     def get_orm_class(self, model_name, *default, **kwargs):
@@ -29,6 +29,14 @@ def configure_environ(dsn_env_name='PROM_DSN', connection_class=DsnConnection):
     PROM_DSN_1, PROM_DSN_3, because it will fail on _2 and move on, so make
     sure your num dsns are in order (eg, 1, 2, 3, ...)
 
+    A dsn with a replica query param will be added as a read replica of the
+    interface with the same connection name, so it needs to come after that
+    interface's dsn
+
+    example --
+        export PROM_DSN_1=postgres://host:port/dbname?replica_stickiness=1#i1
+        export PROM_DSN_2=postgres://replica:port/dbname?replica=1#i1
+
     example --
         export PROM_DSN_1=some.Interface://host:port/dbname#i1
         export PROM_DSN_2=some.Interface://host2:port/dbname2#i2
@@ -41,8 +49,12 @@ def configure_environ(dsn_env_name='PROM_DSN', connection_class=DsnConnection):
     inters = []
     for c in find_environ(dsn_env_name, connection_class=connection_class):
         inter = c.interface
-        set_interface(inter, c.name)
-        inters.append(inter)
+        if c.replica:
+            set_replica(inter, c.name)
+
+        else:
+            set_interface(inter, c.name)
+            inters.append(inter)
 
     return inters
 
@@ -60,7 +72,12 @@ def configure(dsn, connection_class=DsnConnection):
     """
     c = dsnparse.parse(dsn, parse_class=connection_class)
     inter = c.interface
-    set_interface(inter, c.name)
+    if c.replica:
+        set_replica(inter, c.name)
+
+    else:
+        set_interface(inter, c.name)
+
     return inter
 
 
@@ -92,6 +109,24 @@ def set_interface(interface, name=''):
     interfaces[name] = interface
 
 
+def set_replica(interface, name=''):
+    """Add interface as a read replica of the interface with name
+
+    :param interface: Interface, the replica
+    :param name: str, the connection name of the primary interface, it has to
+        be configured before any of its replicas
+    """
+    global interfaces
+
+    if name not in interfaces:
+        raise ValueError(
+            f"Cannot add a replica before its primary connection {name!r}"
+            " is configured"
+        )
+
+    interfaces[name].add_replica(interface)
+
+
 def get_interface(name=''):
     """
     get an interface that was created using configure()
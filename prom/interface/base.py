@@ -1,5 +1,14 @@
 # -*- coding: utf-8 -*-
-from contextlib import asynccontextmanager, AbstractAsyncContextManager
+from contextlib import (
+    asynccontextmanager,
+    AbstractAsyncContextManager,
+    nullcontext,
+)
+import asyncio
+import contextvars
+import inspect
+import itertools
+import time
 import uuid
 from collections import Counter, defaultdict
 from collections.abc import Mapping
@@ -70,6 +79,9 @@ class InterfaceABC[ConnectionT]:
     async def _set_table(self, schema, **kwargs):
         raise NotImplementedError()
 
+    async def _set_tables(self, schemas, **kwargs):
+        raise NotImplementedError()
+
     async def _get_tables(self, table_name, **kwargs):
         raise NotImplementedError()
 
@@ -107,6 +119,15 @@ class InterfaceABC[ConnectionT]:
     ):
         raise NotImplementedError()
 
+    async def _insert_many(self, schema, rows, **kwargs):
+        raise NotImplementedError()
+
+    async def _update_many(self, schema, rows, **kwargs):
+        raise NotImplementedError()
+
+    async def _upsert_many(self, schema, rows, conflict_field_names, **kwargs):
+        raise NotImplementedError()
+
     async def _delete(self, schema, query, **kwargs):
         raise NotImplementedError()
 
@@ -199,6 +220,28 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         # connection can be freed
         self._connections = []
 
+        # the read replicas of this interface, see .add_replica
+        self.replicas = []
+        self._replica_cycle = None
+
+        # if this interface is a replica this will hold the interface it is
+        # a replica of
+        self.primary = None
+
+        # when the last write happened in the current context, this is used
+        # to send reads to the primary right after a write since the replicas
+        # might not have the write yet
+        self._last_write = contextvars.ContextVar(
+            f"prom_last_write_{id(self)}",
+            default=0.0,
+        )
+
+        # what the db's tables look like, table names are the keys and the
+        # values are dicts that can have "exists", "fields", and "indexes"
+        # keys. This keeps the error handlers from querying the catalog over
+        # and over, see .get_schema_cache and .clear_schema_cache
+        self._schema_cache = {}
+
     async def connect(self, config=None, *args, **kwargs):
         """connect to the interface
 
@@ -322,8 +365,90 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
 
         return connected
 
+    def add_replica(self, replica):
+        """Add a read replica, reads that aren't in a transaction will be
+        load-balanced across all the replicas
+
+        If the config has a replica_stickiness option then reads that happen
+        within that many seconds of a write in the same context (eg, the same
+        asyncio task) will go to this interface instead of a replica so they
+        will see the write even if the replicas are lagging behind
+
+        :param replica: Interface, an interface to a replica of this
+            interface's db
+        """
+        replica.primary = self
+        self.replicas.append(replica)
+        self._replica_cycle = itertools.cycle(self.replicas)
+
+    def get_schema_cache(self, table_name) -> dict:
+        """Get the cached information about a table
+
+        :param table_name: str|Schema
+        :returns: dict, changes to this dict will be cached
+        """
+        return self._schema_cache.setdefault(str(table_name), {})
+
+    def clear_schema_cache(self, table_name=None):
+        """Forget the cached information about a table, prom does this
+        whenever it changes a table but this needs to be called if a table is
+        changed some other way (eg, a migration)
+
+        :param table_name: str|Schema, if None then all the tables are
+            forgotten
+        """
+        if table_name is None:
+            self._schema_cache.clear()
+
+        else:
+            self._schema_cache.pop(str(table_name), None)
+
+        for replica in self.replicas:
+            replica.clear_schema_cache(table_name)
+
+    def add_transaction_table(self, table_name, connection=None):
+        """Remember a table was changed in the current transaction so its
+        cached information can be forgotten if the transaction is rolled back,
+        see .fail_transaction
+
+        :param table_name: str|Schema, if None then all the tables were
+            changed
+        :param connection: the connection the table was changed on, defaults
+            to the current connection
+        """
+        if connection is None and self._connections:
+            connection = self._connections[-1]
+
+        if transactions := self._transactions.get(connection, []):
+            transactions[-1]["table_names"].add(
+                None if table_name is None else str(table_name)
+            )
+
+    def get_read_interface(self, **kwargs):
+        """Returns the interface a read query should use, this will be a
+        replica unless the read needs to see what has been written
+
+        :param **kwargs: the read query's kwargs
+        :returns: Interface
+        """
+        if not self.replicas or kwargs.get("connection", None):
+            return self
+
+        if self._connections and self.in_transaction(self._connections[-1]):
+            return self
+
+        stickiness = float(self.config.options.get("replica_stickiness", 0))
+        if stickiness:
+            if time.monotonic() - self._last_write.get() < stickiness:
+                return self
+
+        return next(self._replica_cycle)
+
     async def close(self):
         """close an open connection"""
+        for replica in self.replicas:
+            await replica.close()
+
         if not self.connected:
             return True
 
@@ -457,6 +582,48 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             else:
                 await self.stop_transaction(**kwargs)
 
+    @asynccontextmanager
+    async def pipeline(
+        self,
+        prefix: str = "",
+        connection: ConnectionT|None = None,
+        **kwargs,
+    ) -> AbstractAsyncContextManager[ConnectionT]:
+        """Send all the queries made in the block without waiting for each
+        query's result, if the interface supports it
+
+        Any query that needs its result (eg, an insert that returns the new
+        row) will still wait for it, but queries that don't (eg, BEGIN,
+        COMMIT, or anything with ignore_result=True) won't, so a burst of
+        independent writes takes roughly one round trip instead of one for
+        each query. Interfaces that don't support pipelining will just run
+        the queries normally
+
+        .. note:: Since results aren't waited on, an error might not be
+            raised by the query that caused it but by a later query in the
+            block
+
+        :example:
+            async with self.pipeline() as connection:
+                for o in orms:
+                    await o.save()
+            # everything has been sent and synced by this line
+        """
+        kwargs["prefix"] = prefix if prefix else "pipeline"
+        kwargs["connection"] = connection
+
+        async with self.connection(**kwargs) as connection:
+            async with self._pipeline(connection):
+                yield connection
+
+    def _pipeline(
+        self,
+        connection: ConnectionT,
+    ) -> AbstractAsyncContextManager:
+        """Interfaces that support pipelining should override this to return
+        the connection's pipeline context manager"""
+        return nullcontext(connection)
+
     def transaction_names(self, connection: ConnectionT):
         """Get all the transaction names for logging
 
@@ -488,6 +655,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
               .transaction_current()["nest"]
             - ignored: bool, True if this tx is going to be ignored
             - index: int, the depth of the transaction
+            - table_names: set[str|None], the tables changed in this
+              transaction, see .add_transaction_table
         """
         """start a transaction
 
@@ -509,7 +678,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             "nest": nest,
             "name": name,
             "ignored": ignored,
-            "index": len(transactions)
+            "index": len(transactions),
+            "table_names": set(),
         }
         self._transactions[connection].append(tx)
 
@@ -535,6 +705,10 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         if transactions:
             tx_names = self.transaction_names(connection)
             tx = transactions.pop(-1)
+            if transactions:
+                # the changes are only kept if the parent is committed
+                transactions[-1]["table_names"].update(tx["table_names"])
+
             if not tx["ignored"]:
                 logger.debug(
                     "%s Transaction (%s) stopped",
@@ -557,6 +731,18 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
                 )
                 await self._fail_transaction(connection, tx, **kwargs)
 
+                # the table changes in the transaction were rolled back
+                if None in tx["table_names"]:
+                    self.clear_schema_cache()
+
+                else:
+                    for table_name in tx["table_names"]:
+                        self.clear_schema_cache(table_name)
+
+            elif transactions:
+                # nothing was rolled back, the parent owns the changes
+                transactions[-1]["table_names"].update(tx["table_names"])
+
     async def readonly(self, readonly=True, **kwargs):
         """Make the connection read only (pass in True) or read/write (pass in
         False)
@@ -584,7 +770,12 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             CREATE, DELETE, DROP, INSERT, or UPDATE
         """
         kwargs.setdefault("execute_in_transaction", True)
-        return await self.execute(callback, *args, **kwargs)
+        try:
+            return await self.execute(callback, *args, **kwargs)
+
+        finally:
+            if self.replicas:
+                self._last_write.set(time.monotonic())
 
     async def execute_read(self, callback, *args, **kwargs):
         """Any read statements will use this method
@@ -592,6 +783,23 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         collectively "read statements":
             SELECT
         """
+        interface = self.get_read_interface(**kwargs)
+        if interface is not self:
+            try:
+                return await interface.execute_read(
+                    getattr(interface, callback.__name__),
+                    *args,
+                    **kwargs
+                )
+
+            except (TableError, FieldError) as e:
+                # the primary can fix these errors, the replica can't
+                logger.warning(
+                    "Replica %s read failed, retrying on primary: %s",
+                    callback.__name__,
+                    e,
+                )
+
         kwargs["prefix"] = "execute_read"
         # we need the connection so we can decide if we need to run the query
         # in a tx or not
@@ -630,12 +838,19 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
 
         except Exception as e:
             if await self.handle_error(e=e, prefix=prefix, **kwargs):
-                return await self._execute(
-                    callback,
-                    *args,
-                    prefix=f"{prefix}_retry",
-                    **kwargs
-                )
+                try:
+                    return await self._execute(
+                        callback,
+                        *args,
+                        prefix=f"{prefix}_retry",
+                        **kwargs
+                    )
+
+                except Exception:
+                    # the error handler might have trusted out of date
+                    # cached table information
+                    self.clear_schema_cache()
+                    raise
 
             else:
                 await self.raise_error(e)
@@ -680,12 +895,21 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         :param table_name: str, the table to check
         :returns: bool, True if the table exists, false otherwise
         """
+        # only existence is cached since a missing table is usually about to
+        # be created
+        if self._schema_cache.get(str(table_name), {}).get("exists", False):
+            return True
+
         tables = await self.execute_read(
             self._get_tables,
             table_name,
             **kwargs
         )
-        return len(tables) > 0
+        if tables:
+            self.get_schema_cache(table_name)["exists"] = True
+            return True
+
+        return False
 
     async def get_tables(self, table_name="", **kwargs):
         """Get all the tables of the currently connected db
@@ -718,17 +942,95 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
                 #execute_only=True,
                 **kwargs
             )
-
+            self.add_transaction_table(schema, connection)
+
+            # concurrent indexes can't be built in a transaction so they
+            # are created after the table is committed, unless this
+            # transaction is nested in another one (the stack would hold
+            # more than our transaction), then they are created normally
+            in_transaction = len(self._transactions.get(connection, [])) > 1
+            concurrent_indexes = []
             for index_name, index in schema.indexes.items():
+                if index.options.get("concurrently") and not in_transaction:
+                    concurrent_indexes.append(index)
+
+                else:
+                    await self.execute_write(
+                        self._set_index,
+                        schema=schema,
+                        name=index.name,
+                        field_names=index.field_names,
+                        #connection=connection,
+                        #execute_only=True
+                        **index.options,
+                    )
+
+        self.clear_schema_cache(schema)
+        self.get_schema_cache(schema)["exists"] = True
+
+        for index in concurrent_indexes:
+            await self.set_index(
+                schema,
+                name=index.name,
+                field_names=index.field_names,
+                **index.options,
+            )
+
+    async def set_tables(self, schemas, **kwargs) -> list:
+        """Add all the tables (and their indexes) that don't already exist in
+        the db
+
+        This is much faster than calling .set_table for each schema since
+        the existing tables are found with one query and all the missing
+        tables are created in one transaction
+
+        :param schemas: Iterable[Schema], the schemas these schemas reference
+            (eg, foreign keys) will also be added and tables will be created
+            before the tables that reference them
+        :returns: list[Schema], the schemas whose tables were created
+        """
+        # table names are added to seen before their references so a
+        # reference cycle doesn't recurse forever
+        seen = set()
+        ordered = {}
+
+        def add_schema(schema):
+            if schema.table_name not in seen:
+                seen.add(schema.table_name)
+                for field in schema.fields.values():
+                    if s := field.schema:
+                        add_schema(s)
+                ordered[schema.table_name] = schema
+
+        for schema in schemas:
+            add_schema(schema)
+
+        table_names = set(await self.get_tables(**kwargs))
+        schemas = []
+        for table_name, schema in ordered.items():
+            if table_name in table_names:
+                self.get_schema_cache(schema)["exists"] = True
+
+            else:
+                schemas.append(schema)
+
+        if schemas:
+            kwargs["prefix"] = "set_tables"
+            async with self.transaction(**kwargs) as connection:
+                kwargs["connection"] = connection
                 await self.execute_write(
-                    self._set_index,
-                    schema=schema,
-                    name=index.name,
-                    field_names=index.field_names,
-                    #connection=connection,
-                    #execute_only=True
-                    **index.options,
+                    self._set_tables,
+                    schemas=schemas,
+                    **kwargs
                 )
+                for schema in schemas:
+                    self.add_transaction_table(schema, connection)
+
+            for schema in schemas:
+                self.clear_schema_cache(schema)
+                self.get_schema_cache(schema)["exists"] = True
+
+        return schemas
 
     async def unsafe_delete_table(self, schema, **kwargs):
         """wrapper around delete_table that matches the *_tables variant and
@@ -743,6 +1045,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             schema=schema,
             **kwargs,
         )
+        self.clear_schema_cache(schema)
+        self.add_transaction_table(schema, kwargs.get("connection", None))
 
     async def unsafe_delete_tables(self, **kwargs):
         """Removes all the tables from the db
@@ -751,6 +1055,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         """
         kwargs.setdefault("nest", False)
         await self.execute_write(self._delete_tables, **kwargs)
+        self.clear_schema_cache()
+        self.add_transaction_table(None, kwargs.get("connection", None))
 
     async def _delete_tables(self, **kwargs):
         """This is the generic way to delete all tables, child interfaces can
@@ -777,11 +1083,14 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
 
         return -- dict -- the indexes in {indexname: fields} format
         """
-        return await self.execute_read(
-            self._get_indexes,
-            schema=schema,
-            **kwargs
-        )
+        cache = self.get_schema_cache(schema)
+        if "indexes" not in cache:
+            cache["indexes"] = await self.execute_read(
+                self._get_indexes,
+                schema=schema,
+                **kwargs
+            )
+        return dict(cache["indexes"])
 
     async def set_index(self, schema, name, field_names, **kwargs):
         """
@@ -792,7 +1101,12 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         :param field_names: list, the fields the index should be on
         :param **index_options: any index options that might be useful to
             create the index
+            - concurrently: bool, build the index without blocking writes,
+                this has to run outside of a transaction
         """
+        if kwargs.get("concurrently", False):
+            kwargs.setdefault("execute_in_transaction", False)
+
         await self.execute_write(
             self._set_index,
             schema=schema,
@@ -800,6 +1114,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             field_names=field_names,
             **kwargs,
         )
+        self.get_schema_cache(schema).pop("indexes", None)
+        self.add_transaction_table(schema, kwargs.get("connection", None))
         return True
 
     async def insert(self, schema, fields, **kwargs) -> Mapping|None:
@@ -809,6 +1125,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
         :param fields: dict, the fields {field_name: field_value} to persist
         :keyword ignore_result: bool, True if you don't care about returning
             any result
+        :keyword returning_field_names: Sequence[str], only return these
+            fields of the inserted row
         :keyword **kwargs: passed through
         :returns: all the fields of the inserted row from the db
         """
@@ -819,6 +1137,29 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             **kwargs,
         )
 
+    async def insert_many(self, schema, rows, **kwargs) -> list[Mapping]|None:
+        """Persist many rows into the db using as few queries as possible
+
+        All the rows will be inserted in one transaction
+
+        :param schema: Schema instance, the table the query will run against
+        :param rows: Sequence[Mapping], the fields of each row to persist
+        :keyword batch_size: int, the most rows a single query will have
+        :keyword ignore_result: bool, True if you don't care about returning
+            any result
+        :returns: all the fields of the inserted rows from the db, in the
+            same order as rows
+        """
+        if not rows:
+            return None if kwargs.get("ignore_result", False) else []
+
+        return await self.execute_write(
+            self._insert_many,
+            schema=schema,
+            rows=rows,
+            **kwargs,
+        )
+
     async def update(
         self,
         schema,
@@ -835,6 +1176,8 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             where touched by the update query
         :keyword ignore_result: bool, True if you don't care about returning
             any result
+        :keyword returning_field_names: Sequence[str], only return these
+            fields of the updated rows
         :returns: all the fields of the inserted rows from the db
         """
         return await self.execute_write(
@@ -845,6 +1188,32 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             **kwargs,
         )
 
+    async def update_many(self, schema, rows, **kwargs) -> list[Mapping]|None:
+        """Update many rows, each with its own values, using as few queries as
+        possible
+
+        Each row is matched to the db row using its primary key, all the other
+        fields in the row will be set. All the rows will be updated in one
+        transaction
+
+        :param schema: Schema instance, the table the query will run against
+        :param rows: Sequence[Mapping], the fields of each row, every row has
+            to have the primary key fields
+        :keyword batch_size: int, the most rows a single query will have
+        :keyword ignore_result: bool, True if you don't care about returning
+            any result
+        :returns: all the fields of the updated rows from the db
+        """
+        if not rows:
+            return None if kwargs.get("ignore_result", False) else []
+
+        return await self.execute_write(
+            self._update_many,
+            schema=schema,
+            rows=rows,
+            **kwargs,
+        )
+
     async def upsert(
         self,
         schema,
@@ -873,6 +1242,45 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             **kwargs,
         )
 
+    async def upsert_many(
+        self,
+        schema,
+        rows,
+        conflict_field_names,
+        **kwargs
+    ) -> list[Mapping]|None:
+        """Perform an upsert (insert or update) of many rows using as few
+        queries as possible
+
+        Unlike .upsert, the update fields aren't passed in, on a conflict all
+        the non conflict fields of the row will be updated with the row's
+        values
+
+        All the rows will be upserted in one transaction
+
+        :param schema: Schema instance, the table the query will run against
+        :param rows: Sequence[Mapping], the fields of each row that will be
+            inserted
+        :param conflict_field_names: list, the field names that will decide if
+            an insert or update is performed, every row needs to have these
+            fields
+        :keyword batch_size: int, the most rows a single query will have
+        :keyword ignore_result: bool, True if you don't care about returning
+            any result
+        :param **kwargs: anything else
+        :returns: all the fields of the upserted rows from the db
+        """
+        if not rows:
+            return None if kwargs.get("ignore_result", False) else []
+
+        return await self.execute_write(
+            self._upsert_many,
+            schema=schema,
+            rows=rows,
+            conflict_field_names=conflict_field_names,
+            **kwargs,
+        )
+
     async def delete(self, schema, query, **kwargs) -> list[Mapping]|int|None:
         """delete matching rows according to query filter criteria
 
@@ -910,12 +1318,80 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             **kwargs
         )
 
+    async def gather(self, *queries, concurrency=10, **kwargs) -> list:
+        """Run independent read queries concurrently and return their results
+        in the same order as queries
+
+        All the queries share one connection using .pipeline, so on
+        interfaces that support pipelining the queries are sent without
+        waiting on each other's results
+
+        .. note:: Inside a transaction the queries are ran one at a time
+            since each query would open its own savepoint on the shared
+            connection and savepoints have to be released in order
+
+        :example:
+            foo_count, bars, che = await interface.gather(
+                Foo.query.eq_baz(1).count(),
+                Bar.query.lt_baz(10),
+                Che.query.eq_pk(1).one(),
+            )
+
+        :param *queries: Awaitable|Query, the awaitables (eg, coroutines from
+            Query.count or Query.one) to run, a Query will be ran with
+            Query.tolist
+        :param concurrency: int, the most queries that will run at once
+        :param **kwargs: passed through to .pipeline
+        :returns: list, the result of each query
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(query):
+            try:
+                async with semaphore:
+                    if inspect.isawaitable(query):
+                        return await query
+
+                    else:
+                        return await query.tolist()
+
+            finally:
+                # if another query failed this one might have been cancelled
+                # before it started, closing it stops the "never awaited"
+                # warning
+                if inspect.iscoroutine(query):
+                    query.close()
+
+        kwargs.setdefault("prefix", "gather")
+        async with self.pipeline(**kwargs) as connection:
+            if self.in_transaction(connection):
+                semaphore = asyncio.Semaphore(1)
+
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    tasks = [tg.create_task(run(query)) for query in queries]
+
+            except ExceptionGroup as eg:
+                # callers expect the same errors a query would normally raise
+                raise eg.exceptions[0]
+
+        return [task.result() for task in tasks]
+
     async def get_fields(self, table_name, **kwargs):
-        return await self.execute_read(
-            self._get_fields,
-            str(table_name),
-            **kwargs
-        )
+        cache = self.get_schema_cache(table_name)
+        if "fields" not in cache:
+            fields = await self.execute_read(
+                self._get_fields,
+                str(table_name),
+                **kwargs
+            )
+            if not fields:
+                # the table doesn't exist (yet)
+                return fields
+
+            cache["fields"] = fields
+
+        return dict(cache["fields"])
 
     async def one(self, schema, query, **kwargs):
         """get one row from the db matching filters set in query
@@ -988,6 +1464,11 @@ class Interface[ConnectionT](InterfaceABC[ConnectionT]):
             logger.debug("Handling a close error")
             ret = await self._handle_close_error(e=e, **kwargs)
 
+        elif self.primary:
+            # replicas are read only so they can't fix anything, the primary
+            # will handle the error if it can
+            logger.debug("Replica can't handle the error")
+
         else:
             kwargs["prefix"] = f"{prefix}_handle_error"
             async with self.transaction(**kwargs) as connection:
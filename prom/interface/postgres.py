@@ -9,6 +9,7 @@ import json
 # third party
 import psycopg
 from psycopg.adapt import Dumper
+from datatypes import logging
 
 # first party
 from .sql import SQLInterface
@@ -25,6 +26,9 @@ from ..exception import (
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 class DictDumper(Dumper):
     """Converts from python dict to JSONB to be saved into the db
 
@@ -112,6 +116,12 @@ class PostgreSQL(SQLInterface[psycopg.AsyncConnection]):
         await self._connection.close()
         self._connection = None
 
+    def _pipeline(self, connection):
+        """
+        https://www.psycopg.org/psycopg3/docs/advanced/pipeline.html
+        """
+        return connection.pipeline()
+
     async def _readonly(self, readonly, **kwargs):
         """
         https://www.psycopg.org/psycopg3/docs/api/connections.html#psycopg.Connection.set_read_only
@@ -156,23 +166,107 @@ class PostgreSQL(SQLInterface[psycopg.AsyncConnection]):
         return [r['tablename'] for r in ret]
 
     async def _set_table(self, schema, **kwargs):
-        for field_name, field in schema.fields.items():
-            # https://www.postgresql.org/docs/current/sql-createcollation.html
-            # https://www.postgresql.org/docs/current/collation.html#COLLATION-NONDETERMINISTIC
-            if field.interface_options.get("ignore_case", False):
-                query_str = (
-                    "CREATE COLLATION IF NOT EXISTS case_insensitive (\n"
-                    "  provider = icu,\n"
-                    "  locale = 'und-u-ks-level2',\n"
-                    "  deterministic = false\n"
-                    ")"
-                )
-
-                await self._raw(query_str, ignore_result=True, **kwargs)
-                break
+        if query_str := self.render_collation_sql([schema]):
+            await self._raw(query_str, ignore_result=True, **kwargs)
 
         return await super()._set_table(schema, **kwargs)
 
+    async def _set_tables(self, schemas, **kwargs):
+        """Postgres can run all the statements in one query since there
+        aren't any query arguments"""
+        query_str = ";\n".join(self.render_set_tables_sql(schemas, **kwargs))
+        await self._raw(query_str, ignore_result=True, **kwargs)
+
+    def render_set_tables_sql(self, schemas, **kwargs):
+        statements = super().render_set_tables_sql(schemas, **kwargs)
+        if query_str := self.render_collation_sql(schemas):
+            statements.insert(0, query_str)
+        return statements
+
+    def render_collation_sql(self, schemas):
+        """Render the collation ignore_case fields use if any of the schemas
+        have an ignore_case field
+
+        https://www.postgresql.org/docs/current/sql-createcollation.html
+        https://www.postgresql.org/docs/current/collation.html#COLLATION-NONDETERMINISTIC
+
+        :param schemas: Sequence[Schema]
+        :returns: str, empty if the collation isn't needed
+        """
+        for schema in schemas:
+            for field in schema.fields.values():
+                if field.interface_options.get("ignore_case", False):
+                    return (
+                        "CREATE COLLATION IF NOT EXISTS case_insensitive (\n"
+                        "  provider = icu,\n"
+                        "  locale = 'und-u-ks-level2',\n"
+                        "  deterministic = false\n"
+                        ")"
+                    )
+
+        return ""
+
+    def render_index_concurrently_sql(self, **kwargs):
+        """
+        https://www.postgresql.org/docs/current/sql-createindex.html#SQL-CREATEINDEX-CONCURRENTLY
+
+        NOTE -- a concurrent build can't run inside a transaction so the
+        index is built normally if the connection is in a transaction. If a
+        concurrent build fails it leaves an invalid index behind, see
+        ._set_index
+        """
+        if kwargs.get("concurrently", False):
+            connection = kwargs.get("connection", None)
+            if not connection or not self.in_transaction(connection):
+                return "CONCURRENTLY "
+
+        return ""
+
+    async def _set_index(self, schema, name, field_names, **kwargs):
+        """A failed concurrent build leaves an INVALID index behind, and since
+        the index is created with IF NOT EXISTS every later attempt would
+        silently keep the invalid index, so it is dropped before the error is
+        raised
+        """
+        query_str = self.render_set_index_sql(
+            schema,
+            name,
+            field_names,
+            **kwargs,
+        )
+
+        try:
+            await self._raw(query_str, ignore_result=True, **kwargs)
+
+        except Exception:
+            if self.render_index_concurrently_sql(**kwargs):
+                try:
+                    await self._raw(
+                        "DROP INDEX CONCURRENTLY IF EXISTS {}".format(
+                            self.render_field_name_sql(f"{schema}_{name}"),
+                        ),
+                        ignore_result=True,
+                        **kwargs,
+                    )
+
+                except Exception as e:
+                    logger.warning(
+                        "Failed to drop invalid index %s_%s: %s",
+                        schema,
+                        name,
+                        e,
+                    )
+
+            raise
+
+    def render_index_include_sql(self, field_names):
+        """
+        https://www.postgresql.org/docs/current/indexes-index-only-scans.html
+        """
+        return "INCLUDE ({})".format(
+            ", ".join(map(self.render_field_name_sql, field_names))
+        )
+
     async def _delete_table(self, schema, **kwargs):
         """
         https://www.postgresql.org/docs/current/sql-droptable.html
@@ -361,6 +455,14 @@ class PostgreSQL(SQLInterface[psycopg.AsyncConnection]):
 
         return ',\n'.join(query_sort_str), query_args
 
+    def render_modulo_sql(self, field_name) -> str:
+        # psycopg treats a bare % as the start of a placeholder
+        return "{} %% {} = {}".format(
+            self.render_field_name_sql(field_name),
+            self.PLACEHOLDER,
+            self.PLACEHOLDER,
+        )
+
     def render_date_field_sql(self, field_name, field_kwargs, symbol):
         """
         allow extracting information from date
@@ -394,6 +496,35 @@ class PostgreSQL(SQLInterface[psycopg.AsyncConnection]):
 
         return fstrs
 
+    def render_values_sql(self, schema, field_names, rows, **kwargs):
+        """Postgres types VALUES placeholders as text when it can't infer the
+        type, which fails when the values are used to set non-text fields, so
+        a typed row of NULLs using the table's row type is put first
+
+        https://www.postgresql.org/docs/current/typeconv-union-case.html
+        """
+        query_str, query_vals = super().render_values_sql(
+            schema,
+            field_names,
+            rows,
+            **kwargs,
+        )
+
+        if kwargs.get("typed", False):
+            table_name = self.render_table_name_sql(schema)
+            query_str = "SELECT {} UNION ALL {}".format(
+                ", ".join(
+                    "(NULL::{}).{}".format(
+                        table_name,
+                        self.render_field_name_sql(field_name),
+                    )
+                    for field_name in field_names
+                ),
+                query_str,
+            )
+
+        return query_str, query_vals
+
     def render_datatype_int_sql(self, field_name, field, **kwargs):
         if field.is_ref():
             field_type = 'BIGINT' # INT8
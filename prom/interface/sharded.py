@@ -0,0 +1,584 @@
+# -*- coding: utf-8 -*-
+"""
+Split the rows of a table across multiple dbs using a shard key
+
+:example:
+    from prom.interface import configure, set_interface
+    from prom.interface.sharded import ShardedInterface
+
+    configure("postgres://host1/db#shard1")
+    configure("postgres://host2/db#shard2")
+
+    set_interface(
+        ShardedInterface("tenant_id", "shard1", "shard2"),
+        "tenants",
+    )
+
+    class Foo(Orm):
+        connection_name = "tenants"
+        tenant_id = Field(int, True)
+
+    # only goes to the tenant's shard
+    await Foo.query.eq_tenant_id(1).tolist()
+
+    # goes to all the shards and the results are merged
+    await Foo.query.desc__created().limit(10).tolist()
+"""
+import asyncio
+import inspect
+from contextlib import asynccontextmanager, AsyncExitStack
+import zlib
+
+from datatypes import logging
+
+from ..compat import *
+from ..query import QueryField
+from . import get_interface
+
+
+logger = logging.getLogger(__name__)
+
+
+class ShardCursor(object):
+    """Wraps the merged rows of all the shards so they can be used like an
+    interface cursor (eg, by query.Iterator)"""
+    def __init__(self, rows):
+        self.rows = rows
+        self.rowcount = len(rows)
+        self.index = 0
+
+    async def __aiter__(self):
+        for row in await self.fetchall():
+            yield row
+
+    async def fetchone(self):
+        rows = await self.fetchmany(1)
+        return rows[0] if rows else None
+
+    async def fetchmany(self, size=1):
+        rows = self.rows[self.index:self.index + size]
+        self.index += len(rows)
+        return rows
+
+    async def fetchall(self):
+        rows = self.rows[self.index:]
+        self.index = len(self.rows)
+        return rows
+
+    async def close(self):
+        pass
+
+
+class ShardedInterface(object):
+    """Routes queries to configured interfaces (the shards) using the value of
+    a shard key field
+
+    Queries that have an eq or in where clause on the shard key, and inserts
+    that set the shard key, only go to the shards that hold those values.
+    Everything else goes to all the shards, reads are merged (sorted, offset,
+    and limited) and counts are summed.
+
+    .. note:: Primary keys need to be unique across all the shards (eg, UUID)
+        since updates and deletes without the shard key are sent to all the
+        shards
+
+    .. note:: Transactions are started on every shard but they aren't atomic
+        across the shards
+
+    .. note:: Aggregate, GROUP BY, and HAVING queries raise a ValueError
+        unless they only go to one shard
+    """
+    def __init__(self, shard_field_name, *connection_names):
+        """
+        :param shard_field_name: str, the field whose value decides the shard
+        :param *connection_names: str, the names of the configured interfaces
+            (see prom.interface.interfaces) that are the shards, the order
+            matters since it decides which shard holds a shard key value
+        """
+        if not connection_names:
+            raise ValueError("ShardedInterface needs at least one shard")
+
+        self.shard_field_name = shard_field_name
+        self.connection_names = connection_names
+
+    @property
+    def shards(self):
+        """The shard interfaces, these are looked up when needed so the
+        sharded interface can be created before the shards are configured"""
+        return [get_interface(name) for name in self.connection_names]
+
+    def get_shard_index(self, value):
+        """Returns the index of the shard that holds value
+
+        Child classes can override this to use a different scheme (eg, a
+        lookup table)
+
+        :param value: Any, a shard key value
+        :returns: int
+        """
+        if isinstance(value, int):
+            return value % len(self.connection_names)
+
+        else:
+            # crc32 is stable across processes, unlike hash()
+            value = zlib.crc32(str(value).encode("utf-8"))
+            return value % len(self.connection_names)
+
+    def get_shard(self, value):
+        """Returns the shard interface that holds value"""
+        return self.shards[self.get_shard_index(value)]
+
+    def get_fields_shard_index(self, fields):
+        """Returns the index of the shard for a row
+
+        :param fields: Mapping, the row, this has to have the shard key, the
+            values can be QueryField instances (eg, from Query.insert)
+        :returns: int
+        """
+        try:
+            value = fields[self.shard_field_name]
+
+        except KeyError as e:
+            raise ValueError(
+                f"Missing shard key {self.shard_field_name}"
+            ) from e
+
+        if isinstance(value, QueryField):
+            value = value.value
+
+        return self.get_shard_index(value)
+
+    def get_fields_shard(self, fields):
+        """Returns the shard interface for a row"""
+        return self.shards[self.get_fields_shard_index(fields)]
+
+    def get_query_shards(self, query):
+        """Returns the shard interfaces query needs to run on
+
+        :param query: Query
+        :returns: list[Interface], all the shards if query doesn't narrow
+            down the shard key
+        """
+        shards = self.shards
+        if not query:
+            return shards
+
+        indexes = None
+        for field in query.fields_where:
+            if field.or_clause:
+                # we can't narrow down the shards if there are OR clauses
+                return shards
+
+            if field.name == self.shard_field_name and not field.raw:
+                if field.operator == "eq":
+                    values = [field.value]
+
+                elif field.operator == "in":
+                    values = field.value
+
+                else:
+                    continue
+
+                if any(isinstance(v, type(query)) for v in values):
+                    continue
+
+                field_indexes = set(map(self.get_shard_index, values))
+                if indexes is None:
+                    indexes = field_indexes
+
+                else:
+                    # multiple clauses on the shard key are ANDed
+                    indexes &= field_indexes
+
+        if indexes is None:
+            return shards
+
+        return [shards[i] for i in sorted(indexes)]
+
+    async def scatter(self, shards, method_name, *args, **kwargs):
+        """Call method_name on each of shards concurrently
+
+        :returns: list, the result of each shard
+        """
+        return await asyncio.gather(
+            *(getattr(shard, method_name)(*args, **kwargs) for shard in shards)
+        )
+
+    def is_connected(self):
+        return all(shard.is_connected() for shard in self.shards)
+
+    async def connect(self, *args, **kwargs):
+        for shard in self.shards:
+            await shard.connect()
+        return True
+
+    async def close(self):
+        for shard in self.shards:
+            await shard.close()
+        return True
+
+    def render(self, schema, query, **kwargs):
+        return self.shards[0].render(schema, query, **kwargs)
+
+    @asynccontextmanager
+    async def transaction(self, prefix="", connection=None, **kwargs):
+        """Start a transaction on all the shards
+
+        Every shard has its own connection so no connection is yielded,
+        queries in the block will use each shard's transaction
+        """
+        async with AsyncExitStack() as stack:
+            for shard in self.shards:
+                await stack.enter_async_context(
+                    shard.transaction(prefix=prefix, **kwargs)
+                )
+
+            yield None
+
+    @asynccontextmanager
+    async def pipeline(self, prefix="", connection=None, **kwargs):
+        async with AsyncExitStack() as stack:
+            for shard in self.shards:
+                await stack.enter_async_context(
+                    shard.pipeline(prefix=prefix, **kwargs)
+                )
+
+            yield None
+
+    async def gather(self, *queries, concurrency=10, **kwargs) -> list:
+        """see Interface.gather, the queries don't share a pipeline since
+        each shard has its own connection"""
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(query):
+            async with semaphore:
+                if inspect.isawaitable(query):
+                    return await query
+
+                else:
+                    return await query.tolist()
+
+        return await asyncio.gather(*(run(query) for query in queries))
+
+    async def has_table(self, table_name, **kwargs):
+        return all(await self.scatter(self.shards, "has_table", table_name))
+
+    async def get_tables(self, table_name="", **kwargs):
+        return await self.shards[0].get_tables(table_name, **kwargs)
+
+    async def set_table(self, schema, **kwargs):
+        await self.scatter(self.shards, "set_table", schema, **kwargs)
+
+    async def set_tables(self, schemas, **kwargs):
+        schemas = list(schemas)
+        results = await self.scatter(
+            self.shards,
+            "set_tables",
+            schemas,
+            **kwargs,
+        )
+        # every shard should have the same tables
+        return results[0]
+
+    async def unsafe_delete_table(self, schema, **kwargs):
+        await self.scatter(
+            self.shards,
+            "unsafe_delete_table",
+            schema,
+            **kwargs,
+        )
+
+    async def unsafe_delete_tables(self, **kwargs):
+        await self.scatter(self.shards, "unsafe_delete_tables", **kwargs)
+
+    async def unsafe_clear_table(self, schema, **kwargs):
+        await self.scatter(self.shards, "unsafe_clear_table", schema, **kwargs)
+
+    async def get_indexes(self, schema, **kwargs):
+        return await self.shards[0].get_indexes(schema, **kwargs)
+
+    async def set_index(self, schema, name, field_names, **kwargs):
+        await self.scatter(
+            self.shards,
+            "set_index",
+            schema,
+            name,
+            field_names,
+            **kwargs,
+        )
+        return True
+
+    async def get_fields(self, table_name, **kwargs):
+        return await self.shards[0].get_fields(table_name, **kwargs)
+
+    def clear_schema_cache(self, table_name=None):
+        for shard in self.shards:
+            shard.clear_schema_cache(table_name)
+
+    async def insert(self, schema, fields, **kwargs):
+        shard = self.get_fields_shard(fields)
+        return await shard.insert(schema, fields, **kwargs)
+
+    async def insert_many(self, schema, rows, **kwargs):
+        groups = {}
+        for index, fields in enumerate(rows):
+            shard_index = self.get_fields_shard_index(fields)
+            groups.setdefault(shard_index, []).append((index, fields))
+
+        shards = self.shards
+        ret = [None] * len(rows)
+        for shard_index, group in groups.items():
+            r = await shards[shard_index].insert_many(
+                schema,
+                [fields for _, fields in group],
+                **kwargs,
+            )
+            for (index, _), fields in zip(group, r or []):
+                ret[index] = fields
+
+        return None if kwargs.get("ignore_result", False) else ret
+
+    async def upsert(
+        self,
+        schema,
+        insert_fields,
+        update_fields,
+        conflict_field_names,
+        **kwargs
+    ):
+        shard = self.get_fields_shard(insert_fields)
+        return await shard.upsert(
+            schema,
+            insert_fields,
+            update_fields,
+            conflict_field_names,
+            **kwargs,
+        )
+
+    async def upsert_many(self, schema, rows, conflict_field_names, **kwargs):
+        groups = {}
+        for fields in rows:
+            shard_index = self.get_fields_shard_index(fields)
+            groups.setdefault(shard_index, []).append(fields)
+
+        shards = self.shards
+        ret = []
+        for shard_index, shard_rows in groups.items():
+            r = await shards[shard_index].upsert_many(
+                schema,
+                shard_rows,
+                conflict_field_names,
+                **kwargs,
+            )
+            ret.extend(r or [])
+
+        return None if kwargs.get("ignore_result", False) else ret
+
+    async def update(self, schema, fields, query, **kwargs):
+        results = await self.scatter(
+            self.get_query_shards(query),
+            "update",
+            schema,
+            fields,
+            query,
+            **kwargs,
+        )
+        return self.merge_write_results(results, **kwargs)
+
+    async def update_many(self, schema, rows, **kwargs):
+        # rows without the shard key could be on any of the shards
+        shards = self.shards
+        groups = {}
+        for fields in rows:
+            if self.shard_field_name in fields:
+                shard_index = self.get_fields_shard_index(fields)
+                groups.setdefault(shard_index, []).append(fields)
+
+            else:
+                for shard_index in range(len(shards)):
+                    groups.setdefault(shard_index, []).append(fields)
+
+        ret = []
+        for shard_index, shard_rows in groups.items():
+            r = await shards[shard_index].update_many(
+                schema,
+                shard_rows,
+                **kwargs,
+            )
+            ret.extend(r or [])
+
+        return None if kwargs.get("ignore_result", False) else ret
+
+    async def delete(self, schema, query, **kwargs):
+        results = await self.scatter(
+            self.get_query_shards(query),
+            "delete",
+            schema,
+            query,
+            **kwargs,
+        )
+        return self.merge_write_results(results, **kwargs)
+
+    def merge_write_results(self, results, **kwargs):
+        """Internal method. Combine the update/delete results of each shard
+
+        :param results: list, the result from each shard
+        :returns: list[Mapping]|int|None
+        """
+        if kwargs.get("ignore_result", False):
+            return None
+
+        elif kwargs.get("count_result", False):
+            return sum(r or 0 for r in results)
+
+        else:
+            ret = []
+            for r in results:
+                ret.extend(r or [])
+            return ret
+
+    async def one(self, schema, query, **kwargs):
+        return await self.get(schema, query, fetchone=True, **kwargs) or {}
+
+    async def get(self, schema, query, **kwargs):
+        """get matching rows from the shards, if the query goes to more than
+        one shard then the rows are merged using the query's sort and bounds
+
+        :keyword cursor_result: bool, return a ShardCursor
+        :keyword fetchone: bool, return the first row
+        """
+        shards = self.get_query_shards(query)
+        if len(shards) == 1:
+            return await shards[0].get(schema, query, **kwargs)
+
+        self.check_mergeable(query)
+
+        cursor_result = kwargs.pop("cursor_result", False)
+        fetchone = kwargs.pop("fetchone", False)
+
+        bounds = query.bounds
+        limit, offset = bounds.get()
+
+        shard_query = query
+        if bounds:
+            # each shard needs to return every row that could end up in
+            # the merged rows
+            shard_query = query.copy()
+            shard_query.bounds = query.bounds_class(
+                limit=(limit + offset) if limit else None,
+            )
+
+        # the rows are merged using the sort fields so the shards need to
+        # return them even if they weren't selected
+        sort_names = []
+        if query.fields_select:
+            for field in query.fields_sort:
+                if field.name not in query.fields_select:
+                    sort_names.append(field.name)
+
+            if sort_names:
+                if shard_query is query:
+                    shard_query = query.copy()
+
+                for field_name in sort_names:
+                    shard_query.select_field(field_name)
+
+        rows = []
+        for r in await self.scatter(
+            shards,
+            "get",
+            schema,
+            shard_query,
+            **kwargs,
+        ):
+            rows.extend(r)
+
+        self.sort_rows(query, rows)
+        rows = rows[offset:offset + limit] if limit else rows[offset:]
+
+        if sort_names:
+            field_names = query.fields_select.names()
+            rows = [{k: row[k] for k in field_names} for row in rows]
+
+        if cursor_result:
+            return ShardCursor(rows)
+
+        elif fetchone:
+            return rows[0] if rows else None
+
+        else:
+            return rows
+
+    def check_mergeable(self, query):
+        """Internal method. Make sure the rows query returns from each shard
+        can be merged
+
+        Aggregates and groups are computed per shard, so merging them would
+        return partial results (eg, a sum for every shard)
+
+        :raises: ValueError
+        """
+        if not query:
+            return
+
+        if query.fields_group or query.fields_having:
+            raise ValueError(
+                "GROUP BY and HAVING queries can't be merged across shards"
+            )
+
+        for field in query.fields_select:
+            if field.function_name or field.alias:
+                raise ValueError(
+                    f"Selected aggregate {field.alias or field.name} can't be"
+                    " merged across shards"
+                )
+
+        for field in query.fields_sort:
+            if field.function_name:
+                raise ValueError(
+                    f"Sorting by {field.function_name}({field.name}) can't be"
+                    " merged across shards"
+                )
+
+    def sort_rows(self, query, rows):
+        """Internal method. Sort the merged rows of all the shards in place
+        using query's sort fields"""
+        for field in reversed(query.fields_sort):
+            if field.value:
+                raise ValueError(
+                    f"Sorting {field.name} by values can't be merged across"
+                    " shards"
+                )
+
+            name = field.name
+            rows.sort(
+                # NULL sorts last when ascending, like Postgres
+                key=lambda row: (row[name] is None, row[name]),
+                reverse=field.direction < 0,
+            )
+
+    async def count(self, schema, query, **kwargs):
+        shards = self.get_query_shards(query)
+        if len(shards) > 1:
+            self.check_mergeable(query)
+
+        return sum(
+            await self.scatter(
+                shards,
+                "count",
+                schema,
+                query,
+                **kwargs,
+            )
+        )
+
+    async def has(self, schema, query, **kwargs) -> bool:
+        return any(
+            await self.scatter(
+                self.get_query_shards(query),
+                "has",
+                schema,
+                query,
+                **kwargs,
+            )
+        )
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import os
+import re
 import datetime
 import decimal
 import uuid
@@ -111,11 +112,24 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
             raise NotImplementedError(f"Unknown paramstyle {paramstyle}")
 
     async def _set_table(self, schema, **kwargs):
+        query_str = self.render_set_table_sql(schema, **kwargs)
+        await self._raw(query_str, ignore_result=True, **kwargs)
+
+    async def _set_tables(self, schemas, **kwargs):
+        """Create all the tables and their indexes, the statements are sent
+        one at a time since not every db can run more than one statement in
+        a query, but the caller runs them all in one transaction"""
+        for query_str in self.render_set_tables_sql(schemas, **kwargs):
+            await self._raw(query_str, ignore_result=True, **kwargs)
+
+    def render_set_table_sql(self, schema, **kwargs):
         """
         http://sqlite.org/lang_createtable.html
         http://www.postgresql.org/docs/9.1/static/sql-createtable.html
         http://www.postgresql.org/docs/8.1/static/datatype.html
         http://pythonhosted.org/psycopg2/usage.html#adaptation-of-python-values-to-sql-types
+
+        :returns: str
         """
         query_str = [
             "CREATE TABLE IF NOT EXISTS {} (".format(
@@ -131,8 +145,32 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         query_str.append(",\n".join(query_fields))
 
         query_str.append(")")
-        query_str = "\n".join(query_str)
-        await self._raw(query_str, ignore_result=True, **kwargs)
+        return "\n".join(query_str)
+
+    def render_set_tables_sql(self, schemas, **kwargs):
+        """Render all the statements needed to create the tables of schemas
+        and their indexes
+
+        :param schemas: Sequence[Schema], these should already be in the order
+            they need to be created
+        :returns: list[str]
+        """
+        statements = []
+        for schema in schemas:
+            statements.append(self.render_set_table_sql(schema, **kwargs))
+            for index in schema.indexes.values():
+                # these are brand new tables in a transaction, so there
+                # aren't any writes a concurrent index would avoid blocking
+                options = dict(index.options)
+                options.pop("concurrently", None)
+                statements.append(self.render_set_index_sql(
+                    schema,
+                    name=index.name,
+                    field_names=index.field_names,
+                    **options,
+                ))
+
+        return statements
 
     async def _clear_table(self, schema, **kwargs):
         """This is the generic way to clear a table, child interfaces can
@@ -143,6 +181,15 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         await self._raw(query_str, ignore_result=True, **kwargs)
 
     def _set_index(self, schema, name, field_names, **kwargs):
+        query_str = self.render_set_index_sql(
+            schema,
+            name,
+            field_names,
+            **kwargs,
+        )
+        return self._raw(query_str, ignore_result=True, **kwargs)
+
+    def render_set_index_sql(self, schema, name, field_names, **kwargs):
         """
         NOTE -- we set the index name using <table_name>_<name> format since
         indexes have to have a globally unique name in postgres
@@ -150,15 +197,117 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         * https://www.sqlite.org/lang_createindex.html
         * https://www.postgresql.org/docs/14/sql-createindex.html - "IF NOT
             EXISTS support was added around 9.5
+
+        :keyword unique: bool, True if the index should be unique
+        :keyword concurrently: bool, see .render_index_concurrently_sql
+        :keyword include: Sequence[str], see .render_index_include_sql
+        :keyword where: Query, makes this a partial index that only has the
+            rows that match the query's where clause
+        :returns: str
         """
-        query_str = 'CREATE {}INDEX IF NOT EXISTS {} ON {} ({})'.format(
+        query_str = ['CREATE {}INDEX {}IF NOT EXISTS {} ON {} ({})'.format(
             'UNIQUE ' if kwargs.get('unique', False) else '',
+            self.render_index_concurrently_sql(**kwargs),
             self.render_field_name_sql(f"{schema}_{name}"),
             self.render_table_name_sql(schema),
-            ', '.join(map(self.render_field_name_sql, field_names))
-        )
+            self.render_index_fields_sql(field_names),
+        )]
 
-        return self._raw(query_str, ignore_result=True, **kwargs)
+        if include := kwargs.get("include", None):
+            if include_str := self.render_index_include_sql(include):
+                query_str.append(include_str)
+
+        if query := kwargs.get("where", None):
+            query_str.append(self.render_index_where_sql(schema, query))
+
+        return "\n".join(query_str)
+
+    def render_index_concurrently_sql(self, **kwargs):
+        """Render the keyword that builds the index without locking out
+        writes to the table, interfaces that support it should override this
+
+        :keyword concurrently: bool, True to build the index concurrently
+        :returns: str, including a trailing space if not empty
+        """
+        return ""
+
+    def render_index_include_sql(self, field_names):
+        """Render the non-key fields stored in the index, interfaces that
+        support it should override this
+
+        :param field_names: Sequence[str]
+        :returns: str
+        """
+        return ""
+
+    def render_index_fields_sql(self, field_names):
+        """Render the indexed fields, a field name can use the same function
+        syntax as a select field (eg, "lower(email)") to index an expression
+
+        :param field_names: Sequence[str]
+        :returns: str
+        """
+        fields = []
+        for field_name in field_names:
+            if m := re.match(r"^([^\(]+)\(([^\)]+)\)$", field_name):
+                fields.append("{}({})".format(
+                    m.group(1),
+                    self.render_field_name_sql(m.group(2)),
+                ))
+
+            else:
+                fields.append(self.render_field_name_sql(field_name))
+
+        return ", ".join(fields)
+
+    def render_index_where_sql(self, schema, query):
+        """Render the WHERE clause of a partial index
+
+        Neither Postgres nor SQLite allow placeholders in an index's where
+        clause so the query's values are rendered into the sql
+
+        * https://www.sqlite.org/partialindex.html
+        * https://www.postgresql.org/docs/current/indexes-partial.html
+
+        :param schema: Schema
+        :param query: Query, only the where clause of the query is used
+        :returns: str
+        """
+        query_str, query_args = self.render_where_sql(schema, query)
+        parts = "\n".join(query_str).split(self.PLACEHOLDER)
+        if len(parts) != len(query_args) + 1:
+            raise PlaceholderError(
+                f"Index where clause has {len(parts) - 1} placeholders but"
+                f" {len(query_args)} values"
+            )
+
+        query_str = [parts[0]]
+        for query_arg, part in zip(query_args, parts[1:]):
+            query_str.append(self.render_literal_sql(query_arg))
+            query_str.append(part)
+
+        return "".join(query_str)
+
+    def render_literal_sql(self, val):
+        """Render val so it can be put directly into the sql
+
+        This should only be used when a placeholder can't be used, since it
+        only knows about the basic types
+
+        :param val: Any
+        :returns: str
+        """
+        if val is None:
+            return "NULL"
+
+        elif isinstance(val, bool):
+            return "TRUE" if val else "FALSE"
+
+        elif isinstance(val, (int, float, decimal.Decimal)):
+            return str(val)
+
+        else:
+            return "'{}'".format(String(val).replace("'", "''"))
 
     async def _insert(self, schema, fields, **kwargs):
         query_str, query_args = self.render_insert_sql(
@@ -170,6 +319,53 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         r = await self._raw(query_str, *query_args, **kwargs)
         return r[0] if r else None
 
+    async def _insert_many(self, schema, rows, **kwargs):
+        # rows can only share an INSERT query if they have the same fields, we
+        # keep track of each row's position so the results can be returned
+        # in the same order as rows
+        groups = {}
+        for index, fields in enumerate(rows):
+            groups.setdefault(tuple(fields.keys()), []).append((index, fields))
+
+        ignore_result = kwargs.get("ignore_result", False)
+        ret = [None] * len(rows)
+        batch_size = kwargs.get("batch_size", 500)
+        for field_names, group in groups.items():
+            for i in range(0, len(group), batch_size):
+                batch = group[i:i + batch_size]
+                query_str, query_args = self.render_insert_many_sql(
+                    schema,
+                    field_names,
+                    [fields for _, fields in batch],
+                    **kwargs,
+                )
+
+                r = await self._raw(query_str, *query_args, **kwargs)
+                if not ignore_result:
+                    # RETURNING doesn't guarantee the rows come back in the
+                    # order they were given so they are matched to the rows
+                    # using the primary key if it was sent, or all the sent
+                    # values if the db set the primary key. Rows with the
+                    # same values are interchangeable
+                    pk_names = schema.pk_names
+                    if pk_names and set(pk_names).issubset(field_names):
+                        key_names = pk_names
+
+                    else:
+                        key_names = field_names
+
+                    returned = {}
+                    for fields in r:
+                        key = schema.values_key(key_names, fields)
+                        returned.setdefault(key, []).append(fields)
+
+                    for index, fields in batch:
+                        key = schema.values_key(key_names, fields)
+                        if key_rows := returned.get(key):
+                            ret[index] = key_rows.pop(0)
+
+        return None if ignore_result else ret
+
     async def _update(self, schema, fields, query, **kwargs):
         query_str, query_args = self.render_update_sql(
             schema,
@@ -245,6 +441,108 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         r = await self._raw(query_str, *insert_args, *update_args, **kwargs)
         return r[0] if r else None
 
+    async def _update_many(self, schema, rows, **kwargs):
+        """
+        https://www.sqlite.org/lang_update.html#update_from
+        https://www.postgresql.org/docs/current/sql-update.html
+        """
+        pk_names = schema.pk_names
+
+        # rows can only share an UPDATE query if they have the same fields,
+        # and if a row is in the values more than once only one of them will
+        # be used so we keep the last one
+        groups = {}
+        for fields in rows:
+            try:
+                key = tuple(fields[fn] for fn in pk_names)
+
+            except KeyError as e:
+                raise ValueError(
+                    "Update fields on {} missing primary key {}".format(
+                        schema,
+                        e.args[0],
+                    )
+                ) from e
+
+            if len(fields) > len(pk_names):
+                group = groups.setdefault(tuple(fields.keys()), {})
+                group.pop(key, None)
+                group[key] = fields
+
+        ret = []
+        batch_size = kwargs.get("batch_size", 500)
+        for field_names, group in groups.items():
+            group_rows = list(group.values())
+            for i in range(0, len(group_rows), batch_size):
+                query_str, query_args = self.render_update_many_sql(
+                    schema,
+                    field_names,
+                    group_rows[i:i + batch_size],
+                    **kwargs,
+                )
+
+                if r := await self._raw(query_str, *query_args, **kwargs):
+                    ret.extend(r)
+
+        return None if kwargs.get("ignore_result", False) else ret
+
+    async def _upsert_many(
+        self,
+        schema,
+        rows,
+        conflict_field_names,
+        **kwargs
+    ):
+        """
+        https://www.sqlite.org/lang_UPSERT.html
+        https://www.postgresql.org/docs/current/sql-insert.html#SQL-ON-CONFLICT
+        """
+        if not conflict_field_names:
+            raise ValueError(f"Upsert is missing conflict fields for {schema}")
+
+        # rows can only share an INSERT query if they have the same fields.
+        # Postgres will also fail if a query tries to update the same row
+        # twice, so only the last row for each conflict value is kept, which
+        # is what would happen if the rows were upserted one at a time
+        groups = {}
+        for fields in rows:
+            try:
+                key = tuple(fields[fn] for fn in conflict_field_names)
+                hash(key)
+
+            except KeyError as e:
+                raise ValueError(
+                    "Upsert insert fields on {} missing conflict field {}".format(
+                        schema,
+                        e.args[0],
+                    )
+                ) from e
+
+            except TypeError:
+                key = id(fields)
+
+            group = groups.setdefault(tuple(fields.keys()), {})
+            group.pop(key, None)
+            group[key] = fields
+
+        ret = []
+        batch_size = kwargs.get("batch_size", 500)
+        for field_names, group in groups.items():
+            group_rows = list(group.values())
+            for i in range(0, len(group_rows), batch_size):
+                query_str, query_args = self.render_upsert_many_sql(
+                    schema,
+                    field_names,
+                    group_rows[i:i + batch_size],
+                    conflict_field_names,
+                    **kwargs,
+                )
+
+                if r := await self._raw(query_str, *query_args, **kwargs):
+                    ret.extend(r)
+
+        return None if kwargs.get("ignore_result", False) else ret
+
     async def _delete(self, schema, query, **kwargs):
         """
         https://sqlite.org/lang_delete.html
@@ -367,11 +665,22 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         return await self._raw(query_str, *query_args, **kwargs)
 
     async def _count(self, schema, query, **kwargs):
-        query_str, query_args = self.render_sql(
-            schema,
-            query,
-            count_query=True
-        )
+        if query.fields_group:
+            # every group is a row, so the groups are what get counted
+            query = query.copy()
+            if not query.fields_select:
+                query.select(*query.fields_group.names())
+
+            query_str, query_args = self.render_sql(schema, query)
+            query_str = f"SELECT count(*) as ct FROM ({query_str}) G"
+
+        else:
+            query_str, query_args = self.render_sql(
+                schema,
+                query,
+                count_query=True
+            )
+
         ret = await self._raw(query_str, *query_args, **kwargs)
         if ret:
             ret = int(ret[0]["ct"])
@@ -396,7 +705,18 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         Postgres that can be NULL is really light, but if they have a default
         value, then it can be costly
         """
-        current_fields = await self._get_fields(schema, **kwargs)
+        cache = self.get_schema_cache(schema)
+        current_fields = cache.get("fields", None)
+        if current_fields is not None:
+            if all(fn in current_fields for fn in schema.fields.keys()):
+                # the cached fields are out of date since the table is
+                # missing a field
+                current_fields = None
+
+        if current_fields is None:
+            current_fields = await self._get_fields(schema, **kwargs)
+            cache["fields"] = current_fields
+
         for field_name, field in schema.fields.items():
             if field_name not in current_fields:
                 if field.required:
@@ -418,6 +738,11 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
                     ))
                     query_str = "\n".join(query_str)
                     await self._raw(query_str, ignore_result=True, **kwargs)
+                    cache.pop("fields", None)
+                    self.add_transaction_table(
+                        schema,
+                        kwargs.get("connection", None),
+                    )
 
         return True
 
@@ -427,6 +752,9 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         has a foreign key to a table that doesn't exist, so this method will go
         through all fk refs and make sure all the tables exist
         """
+        # the failed query's result keyword doesn't apply to creating tables
+        kwargs.pop("ignore_result", None)
+
         if query := kwargs.pop("query", None):
             if schemas := query.schemas:
                 for s in schemas:
@@ -437,6 +765,14 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
                         )
                         continue
 
+                    if self.get_schema_cache(s).get("exists", False):
+                        logger.debug(
+                            "%s query foreign key table %s exists",
+                            schema,
+                            s,
+                        )
+                        continue
+
                     logger.warning(
                         "Verifying %s query foreign key table: %s",
                         schema,
@@ -454,10 +790,17 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
                     )
                     continue
 
+                if self.get_schema_cache(s).get("exists", False):
+                    logger.debug("%s foreign key table %s exists", schema, s)
+                    continue
+
                 logger.warning("Verifying %s foreign key table: %s", schema, s)
                 if not await self._handle_table_error(schema=s, e=e, **kwargs):
                     return False
 
+        # the table error could mean the cache is wrong about this table
+        self.clear_schema_cache(schema)
+
         # now that we know all fk tables exist, create this table
         # !!! This uses the external .set_table so it will run through all the 
         # indexes also
@@ -541,17 +884,21 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         """
         if isinstance(name, QueryField):
             if name.function_name:
+                field_name = "*" if name.name == "*" else f"\"{name.name}\""
+                if name.kwargs.get("distinct", False):
+                    field_name = f"DISTINCT {field_name}"
+
                 if name.alias:
-                    return "{}(\"{}\") AS \"{}\"".format(
+                    return "{}({}) AS \"{}\"".format(
                         name.function_name,
-                        name.name,
+                        field_name,
                         name.alias
                     )
 
                 else:
-                    return "{}(\"{}\")".format(
+                    return "{}({})".format(
                         name.function_name,
-                        name.name,
+                        field_name,
                     )
 
             else:
@@ -560,6 +907,19 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         else:
             return "\"{}\"".format(name)
 
+    def render_modulo_sql(self, field_name) -> str:
+        """Returns a raw where clause that is true when the field's value
+        modulo the first placeholder equals the second placeholder
+
+        :param field_name: str
+        :returns: str, eg `"_id" % ? = ?`
+        """
+        return "{} % {} = {}".format(
+            self.render_field_name_sql(field_name),
+            self.PLACEHOLDER,
+            self.PLACEHOLDER,
+        )
+
     def render_select_sql(self, schema, query, **kwargs):
         query_str = []
         query_args = []
@@ -592,8 +952,7 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
                         select_fields_str = ", ".join(
                             (
                                 self.render_field_name_sql(fname)
-                                for fname, f in schema.fields.items()
-                                if f.is_persisted()
+                                for fname in schema.persisted_fields.keys()
                             )
                         )
 
@@ -709,6 +1068,10 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
                 )
 
         else:
+            # a function field (eg, sum(foo)) renders the function also
+            if field.function_name:
+                field_name = field
+
             if is_list and not isinstance(field_val, Query):
                 field_val = make_list(field_val) if field_val else []
                 field_name = self.render_field_name_sql(field_name)
@@ -785,14 +1148,28 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         return format_str, format_args
 
     def render_where_sql(self, schema, query, **kwargs):
+        return self.render_conditions_sql(
+            "WHERE",
+            schema,
+            query.fields_where,
+        )
+
+    def render_conditions_sql(self, keyword, schema, fields):
+        """Render the conditions of a WHERE or HAVING clause
+
+        :param keyword: str, the clause keyword (eg, "WHERE")
+        :param schema: Schema
+        :param fields: QueryFields, the conditions of the clause
+        :returns: tuple[list[str], list[Any]]
+        """
         query_str = []
         query_args = []
 
-        if query.fields_where:
-            query_str.append("WHERE")
+        if fields:
+            query_str.append(keyword)
             or_clause = False
 
-            for i, field in enumerate(query.fields_where):
+            for i, field in enumerate(fields):
                 if i > 0:
                     query_str.append("OR" if or_clause else "AND")
 
@@ -826,6 +1203,33 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
 
         return query_str, query_args
 
+    def render_group_sql(self, schema, query, **kwargs):
+        """Render the GROUP BY and HAVING clauses
+
+        https://www.sqlite.org/lang_select.html#resultset
+        https://www.postgresql.org/docs/current/queries-table-expressions.html#QUERIES-GROUP
+
+        :returns: tuple[list[str], list[Any]]
+        """
+        query_str = []
+        query_args = []
+
+        if query.fields_group:
+            query_str.append("GROUP BY")
+            query_str.append("  {}".format(", ".join(
+                self.render_field_name_sql(f) for f in query.fields_group
+            )))
+
+        having_str, having_args = self.render_conditions_sql(
+            "HAVING",
+            schema,
+            query.fields_having,
+        )
+        query_str.extend(having_str)
+        query_args.extend(having_args)
+
+        return query_str, query_args
+
     def render_sort_sql(self, schema, query, **kwargs):
         query_str = []
         query_args = []
@@ -845,6 +1249,13 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
                     query_sort_str.append(field_sort_str)
                     query_args.extend(field_sort_args)
 
+                elif field.function_name:
+                    # eg, sum("foo") DESC
+                    query_sort_str.append("  {} {}".format(
+                        self.render_field_name_sql(field),
+                        sort_dir_str
+                    ))
+
                 else:
                     query_sort_str.append("  {} {}".format(
                         field.name,
@@ -923,6 +1334,14 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         query_str.extend(where_str)
         query_args.extend(where_args)
 
+        group_str, group_args = self.render_group_sql(
+            schema,
+            query,
+            **kwargs
+        )
+        query_str.extend(group_str)
+        query_args.extend(group_args)
+
         sort_str, sort_args = self.render_sort_sql(
             schema,
             query,
@@ -1016,10 +1435,181 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
         )
 
         if not ignore_result:
+            query_str += " " + self.render_returning_sql(schema, **kwargs)
+
+        return query_str, query_vals
+
+    def render_insert_many_sql(
+        self,
+        schema,
+        field_names,
+        rows,
+        **kwargs
+    ) -> tuple[str, list]:
+        """Render one multi-row INSERT query
+
+        https://www.sqlite.org/lang_insert.html
+
+        :param field_names: Sequence[str], the fields every row has
+        :param rows: Sequence[Mapping], the rows that will be inserted
+        :returns: tuple[str, list]
+        """
+        values_sql, query_vals = self.render_values_sql(
+            schema,
+            field_names,
+            rows,
+        )
+
+        query_str = "INSERT INTO {} ({}) {}".format(
+            self.render_table_name_sql(schema),
+            ", ".join(map(self.render_field_name_sql, field_names)),
+            values_sql,
+        )
+
+        if not kwargs.get("ignore_result", False):
             query_str += " " + self.render_returning_sql(schema)
 
         return query_str, query_vals
 
+    def render_upsert_many_sql(
+        self,
+        schema,
+        field_names,
+        rows,
+        conflict_field_names,
+        **kwargs
+    ) -> tuple[str, list]:
+        """Render one multi-row INSERT ... ON CONFLICT query
+
+        https://www.sqlite.org/lang_UPSERT.html
+        https://www.postgresql.org/docs/current/sql-insert.html#SQL-ON-CONFLICT
+
+        :param field_names: Sequence[str], the fields every row has
+        :param rows: Sequence[Mapping], the rows that will be inserted
+        :param conflict_field_names: Sequence[str]
+        :returns: tuple[str, list]
+        """
+        values_sql, query_vals = self.render_values_sql(
+            schema,
+            field_names,
+            rows,
+        )
+
+        update_sql = []
+        for field_name in field_names:
+            if field_name not in conflict_field_names:
+                name_sql = self.render_field_name_sql(field_name)
+                update_sql.append(f"{name_sql} = EXCLUDED.{name_sql}")
+
+        query_str = "INSERT INTO {} ({}) {} ON CONFLICT({}) {}".format(
+            self.render_table_name_sql(schema),
+            ", ".join(map(self.render_field_name_sql, field_names)),
+            values_sql,
+            ", ".join(map(self.render_field_name_sql, conflict_field_names)),
+            (
+                "DO UPDATE SET {}".format(", ".join(update_sql))
+                if update_sql
+                else "DO NOTHING"
+            ),
+        )
+
+        if not kwargs.get("ignore_result", False):
+            query_str += " " + self.render_returning_sql(schema)
+
+        return query_str, query_vals
+
+    def render_values_sql(self, schema, field_names, rows, **kwargs) -> str:
+        """Render a VALUES list of rows
+
+        :param field_names: Sequence[str], the fields every row has, the
+            values will be in this order
+        :param rows: Sequence[Mapping]
+        :keyword typed: bool, True if the values will be used somewhere that
+            the db can't infer their types from (eg, UPDATE ... FROM), SQLite
+            doesn't care
+        :returns: tuple[str, list]
+        """
+        query_vals = []
+        values = []
+        for fields in rows:
+            field_values = []
+            for field_name in field_names:
+                field_value, field_query_vals = self.render_set_value_sql(
+                    fields[field_name]
+                )
+                field_values.append(field_value)
+                query_vals.extend(field_query_vals)
+
+            values.append("({})".format(", ".join(field_values)))
+
+        return "VALUES {}".format(",\n".join(values)), query_vals
+
+    def render_update_many_sql(
+        self,
+        schema,
+        field_names,
+        rows,
+        **kwargs
+    ) -> tuple[str, list]:
+        """Render one UPDATE query that sets different values on each row
+
+        The rows are put into a VALUES list that is joined to the table using
+        the primary key
+
+        https://www.sqlite.org/lang_update.html#update_from
+        https://www.postgresql.org/docs/current/sql-update.html
+
+        :param field_names: Sequence[str], the fields every row has, this has
+            to include the primary key fields
+        :param rows: Sequence[Mapping], the rows that will be updated
+        :returns: tuple[str, list]
+        """
+        table_name = self.render_table_name_sql(schema)
+        values_name = self.render_field_name_sql("prom_values")
+
+        values_sql, query_vals = self.render_values_sql(
+            schema,
+            field_names,
+            rows,
+            typed=True,
+        )
+
+        set_sql = []
+        for field_name in field_names:
+            if field_name not in schema.pk_names:
+                name_sql = self.render_field_name_sql(field_name)
+                set_sql.append(f"{name_sql} = {values_name}.{name_sql}")
+
+        where_sql = []
+        for field_name in schema.pk_names:
+            name_sql = self.render_field_name_sql(field_name)
+            where_sql.append(
+                f"{table_name}.{name_sql} = {values_name}.{name_sql}"
+            )
+
+        query_str = "WITH {}({}) AS ({}) UPDATE {} SET {} FROM {} WHERE {}"
+        query_str = query_str.format(
+            values_name,
+            ", ".join(map(self.render_field_name_sql, field_names)),
+            values_sql,
+            table_name,
+            ",\n".join(set_sql),
+            values_name,
+            " AND ".join(where_sql),
+        )
+
+        if not kwargs.get("ignore_result", False):
+            # the values have the same names as the table's fields so the
+            # returned fields have to be qualified
+            query_str += " RETURNING {}".format(
+                ", ".join(
+                    f"{table_name}.{self.render_field_name_sql(fn)}"
+                    for fn in schema.persisted_fields.keys()
+                ),
+            )
+
+        return query_str, query_vals
+
     def render_update_sql(self, schema, fields, query, **kwargs) -> str:
         """
         https://www.sqlite.org/lang_update.html
@@ -1063,21 +1653,23 @@ class SQLInterface[ConnectionT](SQLInterfaceABC[ConnectionT]):
             query_args.extend(where_query_args)
 
         if not ignore_result:
-            query_str += " " + self.render_returning_sql(schema)
+            query_str += " " + self.render_returning_sql(schema, **kwargs)
 
         return query_str, query_args
 
     def render_returning_sql(self, schema, **kwargs) -> str:
         """
         https://www.sqlite.org/lang_returning.html
+
+        :keyword returning_field_names: Sequence[str], only return these
+            fields instead of all the persisted fields
         """
+        field_names = kwargs.get("returning_field_names", None)
+        if not field_names:
+            field_names = schema.persisted_fields.keys()
+
         return "RETURNING {}".format(
-            ", ".join(
-                map(
-                    self.render_field_name_sql,
-                    schema.persisted_fields.keys(),
-                ),
-            ),
+            ", ".join(map(self.render_field_name_sql, field_names)),
         )
 
     def render_datatype_sql(self, field_name, field):
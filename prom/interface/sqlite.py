@@ -44,6 +44,7 @@ from ..exception import (
 )
 
 from ..compat import *
+from ..query import QueryField
 from .sql import SQLInterface
 
 
@@ -537,6 +538,61 @@ class SQLite(SQLInterface[AsyncConnection]):
 
         return ret
 
+    def render_set_index_sql(self, schema, name, field_names, **kwargs):
+        """SQLite doesn't have INCLUDE so the included fields are appended
+        to the end of a non-unique index, which gives a covering index that
+        can still be used for the leading fields. A unique index ignores them
+        since they would change what is unique
+
+        :keyword include: Sequence[str], fields that will only be stored in
+            the index so queries that select them don't need the table
+        :returns: str
+        """
+        include = kwargs.get("include", None)
+        if include and not kwargs.get("unique", False):
+            field_names = list(field_names)
+            field_names.extend(
+                fn for fn in include if fn not in field_names
+            )
+
+        return super().render_set_index_sql(
+            schema,
+            name,
+            field_names,
+            **kwargs
+        )
+
+    def render_field_name_sql(self, name):
+        """min and max return a column's values but SQLite doesn't keep the
+        column's declared type, so the type is added to the alias where
+        PARSE_COLNAMES will find it and run the type's converter
+
+        https://docs.python.org/3/library/sqlite3.html#sqlite3.PARSE_COLNAMES
+
+        :example:
+            max("_created") AS "max__created [TIMESTAMP]"
+        """
+        ret = super().render_field_name_sql(name)
+        if isinstance(name, QueryField) and name.function_name and name.alias:
+            if name.function_name.lower() in ("min", "max"):
+                if sf := name.schema_field:
+                    interface_type = sf.interface_type
+                    field_type = ""
+                    if issubclass(interface_type, bool):
+                        field_type = BooleanType.FIELD_TYPE
+
+                    elif issubclass(interface_type, datetime.datetime):
+                        field_type = DatetimeType.FIELD_TYPE
+
+                    elif issubclass(interface_type, decimal.Decimal):
+                        field_type = DecimalType.FIELD_TYPE
+
+                    if field_type:
+                        # the alias is the last thing in ret, eg AS "alias"
+                        ret = "{} [{}]\"".format(ret[:-1], field_type)
+
+        return ret
+
     def render_date_field_sql(self, field_name, field_kwargs, symbol):
         """
         allow extracting information from date
@@ -63,9 +63,22 @@ class Orms(ClassKeyFinder):
         self.lookup_ref_table = {}
 
         # dependency lookup table (a dependency is all the orms that ref
-        # an orm
+        # an orm), the keys are the ref model names and the values are lists
+        # of the absolute orm classes that have a foreign key to that model.
+        # This is updated incrementally as classes are added, see
+        # .add_class and ._update_dep_table
         self.lookup_dep_table = {}
 
+        # the orm classes currently in .lookup_dep_table, the values are the
+        # ref model names the class was added under so it can be removed
+        self.lookup_dep_classes = {}
+
+        # orm classes that have been added but that aren't in
+        # .lookup_dep_table yet, we wait until the table is needed because
+        # creating an orm's schema when the class is added isn't safe (its
+        # ref classes might not be loaded yet)
+        self.lookup_dep_pending = {}
+
         # lookup table for "lookup table" orms
         self.lookup_rel_table = {}
 
@@ -75,7 +88,37 @@ class Orms(ClassKeyFinder):
 
     def add_class(self, orm_class):
         super().add_class(orm_class)
-        self._clear_lookups()
+        self.lookup_ref_table.pop(orm_class.model_name, None)
+
+        # any parents of orm_class are no longer absolute classes so they
+        # shouldn't be dependencies anymore
+        for parent_class in inspect.getmro(orm_class)[1:]:
+            self.lookup_dep_pending.pop(parent_class, None)
+            model_names = self.lookup_dep_classes.pop(parent_class, None)
+            if model_names is not None:
+                for model_name in model_names:
+                    self.lookup_dep_table[model_name].remove(parent_class)
+
+                self.lookup_rel_table = {}
+
+        self.lookup_dep_pending[orm_class] = None
+
+    def _update_dep_table(self):
+        """Internal method. Adds any pending orm classes to the dependency
+        lookup table"""
+        while self.lookup_dep_pending:
+            dep_class = next(iter(self.lookup_dep_pending))
+            model_names = []
+            for f in dep_class.schema.ref_fields.values():
+                model_name = f.ref_class.model_name
+                dep_classes = self.lookup_dep_table.setdefault(model_name, [])
+                dep_classes.append(dep_class)
+                model_names.append(model_name)
+
+            self.lookup_dep_classes[dep_class] = model_names
+            self.lookup_dep_pending.pop(dep_class)
+            if model_names:
+                self.lookup_rel_table = {}
 
     def find_class(self, name_or_class, *default):
         if isinstance(name_or_class, str):
@@ -202,18 +245,8 @@ class Orms(ClassKeyFinder):
         :returns: list[Orm]
         """
         orm_class = self.find_class(name_or_class, None)
-        model_name = orm_class.model_name
-
-        if model_name not in self.lookup_dep_table:
-            dep_classes = []
-            for dep_class in self.get_abs_classes():
-                for ref_class in self.get_ref_classes(dep_class.model_name):
-                    if ref_class.model_name == model_name:
-                        dep_classes.append(dep_class)
-
-            self.lookup_dep_table[model_name] = dep_classes
-
-        return self.lookup_dep_table[model_name]
+        self._update_dep_table()
+        return self.lookup_dep_table.get(orm_class.model_name, [])
 
     def get_rel_classes(self, name_or_class_1, name_or_class_2):
         """Get lookup table classes for the given orm classes
@@ -252,6 +285,7 @@ class Orms(ClassKeyFinder):
 
         key_name = f"{model_name_1}-{model_name_2}"
 
+        self._update_dep_table()
         if key_name not in self.lookup_rel_table:
             rel_classes = []
 
@@ -330,6 +364,15 @@ class Orm(object):
     """This will hold all other orm classes that have been loaded into memory
     the class path is the key and the class object is the value"""
 
+    getattr_getters = [
+        "get_method_value",
+        "get_ref_value",
+        "get_dep_value",
+        "get_rel_value",
+    ]
+    """The methods .__getattr__ will try, in order, to resolve a name that
+    isn't a field"""
+
     _id = AutoIncrement()
     """The primary key is an auto-increment integer by default
 
@@ -768,18 +811,70 @@ class Orm(object):
         # this marks that this was repopulated from the interface (database)
         self._interface_pk = self.pk
 
-    async def insert(self, **kwargs) -> None:
-        """persist the field values of this orm"""
-        schema = self.schema
-        q = self.query.set(self.to_interface())
+    async def insert(self, returning="all", **kwargs) -> None:
+        """persist the field values of this orm
+
+        :param returning: str, see .save
+        """
+        fields = self.to_interface()
+        q = self.query.set(fields)
+
+        if returning == "none" and self.schema.pk.name not in fields:
+            # we can't skip returning the primary key if the db creates it
+            returning = "pk"
 
-        fields = await q.insert(**kwargs)
-        self.from_interface(fields or {})
+        kwargs = self.returning_kwargs(returning, fields, **kwargs)
+        r = await q.insert(**kwargs)
+        self.from_interface(self.returning_fields(returning, fields, r))
 
-    async def update(self, **kwargs) -> None:
+    @classmethod
+    async def insert_many(cls, orms, **kwargs) -> list:
+        """persist the field values of all the orms using as few queries as
+        possible
+
+        :param orms: Sequence[Orm], the unpersisted instances to insert
+        :param **kwargs: passed through to the interface
+        :keyword ignore_result: bool, don't have the db send back the rows,
+            every orm needs to have its primary key set since the orms
+            couldn't be saved again without it
+        :returns: list[Orm], orms, which will be updated with the db values
+        """
+        orms = list(orms)
+        rows = [o.to_interface() for o in orms]
+
+        if kwargs.get("ignore_result", False):
+            pk_name = cls.schema.pk.name
+            if any(fields.get(pk_name) is None for fields in rows):
+                raise ValueError(
+                    "Cannot ignore the result of inserting orms without a"
+                    " primary key"
+                )
+
+        returned_rows = await cls.interface.insert_many(
+            cls.schema,
+            rows,
+            **kwargs,
+        )
+
+        for o, fields, returned_fields in zip(
+            orms,
+            rows,
+            returned_rows or [None] * len(rows),
+        ):
+            # if the db didn't send the row back (eg, ignore_result) we mimic
+            # it sending back the fields we sent so they aren't modified
+            o.from_interface({**fields, **(returned_fields or {})})
+
+        return orms
+
+    async def update(self, returning="all", **kwargs) -> None:
         """re-persist the updated field values of this orm that has a primary
-        key"""
-        q = self.query.set(self.to_interface())
+        key
+
+        :param returning: str, see .save
+        """
+        fields = self.to_interface()
+        q = self.query.set(fields)
 
         if pk := self._interface_pk:
             q.eq_field(self.schema.pk.name, pk)
@@ -787,12 +882,72 @@ class Orm(object):
         else:
             raise ValueError("Cannot update an unpersisted orm instance")
 
-        fields = {}
+        r = {}
+        kwargs = self.returning_kwargs(returning, fields, **kwargs)
         if rows := await q.update(**kwargs):
             if not isinstance(rows, int):
-                fields = rows[0]
+                r = rows[0]
 
-        self.from_interface(fields)
+        self.from_interface(self.returning_fields(returning, fields, r))
+
+    @classmethod
+    async def update_many(cls, orms, **kwargs) -> list:
+        """re-persist the updated field values of all the orms using as few
+        queries as possible
+
+        Only the modified fields of each orm are sent to the db, orms that
+        have the same modified fields will be updated in the same query
+
+        :param orms: Sequence[Orm], the persisted instances to update
+        :param **kwargs: passed through to the interface
+        :returns: list[Orm], orms, which will be updated with the db values
+        """
+        orms = list(orms)
+        pk_name = cls.schema.pk.name
+
+        rows = []
+        pk_orms = []
+        for o in orms:
+            if pk := o._interface_pk:
+                fields = o.to_interface()
+                if pk_name in fields and fields[pk_name] != pk:
+                    # changing the primary key means the row can't be found
+                    # using the fields so it needs its own query
+                    pk_orms.append(o)
+
+                else:
+                    fields[pk_name] = pk
+                    rows.append((o, fields))
+
+            else:
+                raise ValueError("Cannot update an unpersisted orm instance")
+
+        # the primary key changes shouldn't be committed if the bulk update
+        # fails
+        async with cls.transaction(
+            connection=kwargs.get("connection", None),
+        ) as conn:
+            kwargs["connection"] = conn
+
+            for o in pk_orms:
+                await o.update(**kwargs)
+
+            returned_rows = await cls.interface.update_many(
+                cls.schema,
+                [fields for _, fields in rows],
+                **kwargs,
+            )
+
+        lookup = {}
+        for fields in (returned_rows or []):
+            lookup[fields[pk_name]] = fields
+
+        for o, fields in rows:
+            # if the db didn't send the row back (eg, ignore_result) we mimic
+            # it sending back the fields we sent so they aren't modified
+            o.from_interface({**fields, **lookup.get(fields[pk_name], {})})
+
+        return orms
 
     async def upsert(self, **kwargs) -> None:
         """Perform an UPSERT query where we insert the fields if they don't
@@ -829,19 +984,136 @@ class Orm(object):
             fields = await q.upsert([t[0] for t in conflict_fields], **kwargs)
             self.from_interface(fields)
 
-    async def save(self, **kwargs) -> None:
+    @classmethod
+    async def upsert_many(
+        cls,
+        orms,
+        conflict_field_names=None,
+        **kwargs
+    ) -> list:
+        """Upsert all the orms using as few queries as possible
+
+        Unlike .upsert, this will always upsert, even if the orms were
+        already persisted, since that is the point of calling this method
+
+        :param orms: Sequence[Orm], the instances to upsert
+        :param conflict_field_names: list[str], the field names that will
+            decide if an insert or update happens, if this isn't passed in then
+            they will be found the same way .upsert finds them using the first
+            orm in orms
+        :param **kwargs: passed through to the interface
+        :returns: list[Orm], orms, which will be updated with the db values
+        """
+        orms = list(orms)
+        if not orms:
+            return orms
+
+        rows = [o.to_interface() for o in orms]
+
+        if not conflict_field_names:
+            conflict_fields = orms[0].conflict_fields(rows[0])
+            if not conflict_fields:
+                raise ValueError(
+                    "Failed to find conflict field names from: {}".format(
+                        list(rows[0].keys()),
+                    ),
+                )
+
+            conflict_field_names = [t[0] for t in conflict_fields]
+
+        returned_rows = await cls.interface.upsert_many(
+            cls.schema,
+            rows,
+            conflict_field_names,
+            **kwargs,
+        )
+
+        if returned_rows:
+            # RETURNING order isn't guaranteed so the db rows are matched back
+            # to the orms using the conflict values
+            lookup = {}
+            for fields in returned_rows:
+                lookup[cls.conflict_key(conflict_field_names, fields)] = fields
+
+            for o, fields in zip(orms, rows):
+                key = cls.conflict_key(conflict_field_names, fields)
+                if key in lookup:
+                    o.from_interface(lookup[key])
+
+        return orms
+
+    @classmethod
+    def conflict_key(cls, field_names, fields) -> tuple:
+        """Internal method. Returns a hashable key of the field_names values
+        in fields that is the same whether fields came from the db or was
+        going to the db, see Schema.values_key
+
+        :param field_names: Sequence[str]
+        :param fields: Mapping, the interface fields
+        :returns: tuple
+        """
+        return cls.schema.values_key(field_names, fields)
+
+    async def save(self, returning="all", **kwargs) -> None:
         """persist the fields in this object into the db, this will update if
         _id is set, otherwise it will insert
 
         see also -- .insert(), .update()
 
+        :param returning: str, what the db should send back after the save,
+            this is handy for wide tables with big fields you don't want to
+            get back every time you save
+            * "all" - every persisted field, this is the default
+            * "modified" - only the primary key and the fields that were
+                saved
+            * "pk" - only the primary key, the saved fields will use the
+                values that were sent to the db
+            * "none" - nothing, this is the same as "pk" when inserting a row
+                that will have the db create the primary key
+            With anything but "all", fields the db sets on its own (eg,
+            a default or trigger value) won't be updated on the orm
         :returns: bool, True if the save was successful
         """
         if pk := self._interface_pk:
-            return await self.update(**kwargs)
+            return await self.update(returning=returning, **kwargs)
 
         else:
-            return await self.insert(**kwargs)
+            return await self.insert(returning=returning, **kwargs)
+
+    @classmethod
+    async def save_many(cls, orms, **kwargs) -> list:
+        """persist all the orms, inserting the new ones and updating the
+        persisted ones, using as few queries as possible
+
+        This is the bulk version of:
+
+            for o in orms:
+                await o.save()
+
+        Everything happens in one transaction. Since the orms are saved
+        using .insert_many and .update_many any overridden .insert or .update
+        methods won't be called
+
+        :param orms: Sequence[Orm]
+        :param **kwargs: passed through to the interface
+        :returns: list[Orm], orms, which will be updated with the db values
+        """
+        orms = list(orms)
+        inserts = [o for o in orms if o.is_insert()]
+        updates = [o for o in orms if o.is_update()]
+
+        async with cls.transaction(
+            connection=kwargs.get("connection", None),
+        ) as conn:
+            kwargs["connection"] = conn
+
+            if inserts:
+                await cls.insert_many(inserts, **kwargs)
+
+            if updates:
+                await cls.update_many(updates, **kwargs)
+
+        return orms
 
     async def delete(self, **kwargs) -> None:
         """delete the object from the db if pk is set"""
@@ -863,6 +1135,50 @@ class Orm(object):
         self._interface_pk = None
         self._interface_hydrate = False
 
+    def returning_kwargs(self, returning, fields, **kwargs):
+        """Internal method. Set the interface keywords for the returning
+        value of .save/.insert/.update
+
+        :param returning: str, see .save
+        :param fields: dict, the fields being sent to the interface
+        :returns: dict, kwargs with the returning keywords set
+        """
+        pk_name = self.schema.pk.name
+
+        if returning == "pk":
+            kwargs["returning_field_names"] = [pk_name]
+
+        elif returning == "modified":
+            kwargs["returning_field_names"] = [
+                pk_name,
+                *(k for k in fields.keys() if k != pk_name),
+            ]
+
+        elif returning == "none":
+            kwargs["ignore_result"] = True
+
+        elif returning != "all":
+            raise ValueError(f"Unknown returning value: {returning}")
+
+        return kwargs
+
+    def returning_fields(self, returning, fields, returned_fields):
+        """Internal method. Get the fields that .from_interface should use
+        after .insert/.update
+
+        :param returning: str, see .save
+        :param fields: dict, the fields that were sent to the interface
+        :param returned_fields: dict|None, the fields the interface returned
+        :returns: dict
+        """
+        if returning == "all":
+            return returned_fields or {}
+
+        else:
+            # the db didn't send back everything so we mimic it sending back
+            # the fields we sent it
+            return {**fields, **(returned_fields or {})}
+
     def conflict_fields(self, fields):
         """Internal method. This will find fields that can be used for
         .upsert/.load
@@ -885,9 +1201,10 @@ class Orm(object):
                 break
 
         if not conflict_fields:
-            # no luck with the primary key, so let's check unique indexes
+            # no luck with the primary key, so let's check unique indexes,
+            # a partial index only covers some rows so it can't be used
             for index in schema.indexes.values():
-                if index.unique:
+                if index.unique and not index.where:
                     for field_name in index.field_names:
                         if field_name in fields:
                             conflict_fields.append(
@@ -1174,27 +1491,36 @@ class Orm(object):
         NOTE -- this is a hybrid method, sometimes it will return coroutines
         """
         ret = None
-        try:
-            field_name = self.schema.field_name(k)
+        schema = self.schema
 
-        except AttributeError:
+        # once k has been resolved we cache the name of the method that
+        # resolved it so we can skip straight to that method next time
+        getters = schema.lookup["getattr"]
+        if getter_name := getters.get(k, None):
             try:
-                return self.get_method_value(k)
+                return getattr(self, getter_name)(k)
+
+            except (AttributeError, KeyError):
+                getters.pop(k, None)
+
+        try:
+            field_name = schema.field_name(k)
 
-            except AttributeError:
+        except AttributeError:
+            for getter_name in self.getattr_getters:
                 try:
-                    return self.get_ref_value(k)
+                    ret = getattr(self, getter_name)(k)
 
                 except AttributeError:
-                    try:
-                        return self.get_dep_value(k)
+                    pass
 
-                    except AttributeError:
-                        try:
-                            return self.get_rel_value(k)
+                except KeyError:
+                    if getter_name != "get_rel_value":
+                        raise
 
-                        except (AttributeError, KeyError):
-                            pass
+                else:
+                    getters[k] = getter_name
+                    return ret
 
             raise
 
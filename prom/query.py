@@ -2,15 +2,89 @@
 """
 Classes and stuff that handle querying the interface for a passed in Orm class
 """
+import asyncio
 import copy
-from collections import defaultdict
-from collections.abc import AsyncIterable
+import functools
+import inspect
+from collections.abc import AsyncIterable, Mapping
+from contextlib import aclosing, nullcontext
 import re
 
 from datatypes import ListIterator
 
 from .compat import *
 from .utils import make_list, get_objects, make_dict
+from .interface import get_interface
+
+
+def hydrate_row(orm_class, field_names, d):
+    """Hydrate one raw row into what the query returns, this is what
+    Iterator.from_query does by default, see also hydrate_rows
+
+    :param orm_class: type[Orm]|None
+    :param field_names: Sequence[str]|Mapping[str, str|None], the selected
+        field names, a mapping has the schema field each selected value
+        comes from (see QueryFields.value_field_names)
+    :param d: Mapping, the raw row from the cursor
+    :returns: Orm|tuple[Any]|Any
+    """
+    if field_names:
+        if not isinstance(field_names, Mapping):
+            field_names = {fn: fn for fn in field_names}
+
+        field_vals = []
+        for field_name, value_field_name in field_names.items():
+            fv = d[field_name]
+            if orm_class and value_field_name:
+                # aggregates (eg, sum_foo) aren't fields
+                if field := orm_class.schema.fields.get(value_field_name):
+                    fv = field.from_interface(None, fv)
+            field_vals.append(fv)
+        return field_vals if len(field_names) > 1 else field_vals[0]
+
+    elif orm_class:
+        return orm_class.from_query(d)
+
+    else:
+        return d
+
+
+def hydrate_rows(orm_class, field_names, rows, as_dict=False):
+    """Hydrate a batch of raw rows
+
+    Hydrating is CPU bound, so batch jobs with spare cores can hydrate the raw
+    rows of Iterator.row_batches in worker processes. The orm class has to be
+    picklable (eg, defined at the top level of a module)
+
+    :example:
+        with ProcessPoolExecutor() as executor:
+            loop = asyncio.get_running_loop()
+            it = await Foo.query.get()
+            async for rows in it.row_batches(1000):
+                foos = await loop.run_in_executor(
+                    executor,
+                    hydrate_rows,
+                    Foo,
+                    it.field_names,
+                    # cursor rows (eg, sqlite3.Row) aren't always picklable
+                    [dict(row) for row in rows],
+                )
+
+    :param orm_class: type[Orm]|None
+    :param field_names: Sequence[str]|Mapping[str, str|None], see
+        hydrate_row
+    :param rows: list[Mapping], the raw rows from the cursor
+    :param as_dict: bool, return the orm fields instead of the orm, this is
+        cheaper to send back from a worker process
+    :returns: list[Orm|dict|tuple[Any]|Any]
+    """
+    ret = []
+    for d in rows:
+        r = hydrate_row(orm_class, field_names, d)
+        if as_dict and orm_class and not field_names:
+            r = r.fields
+        ret.append(r)
+    return ret
 
 
 class Iterator(ListIterator, AsyncIterable):
@@ -45,7 +119,7 @@ class Iterator(ListIterator, AsyncIterable):
 
         self._cursor = cursor
         self._cursor_exhausted = False
-        self.field_names = self.query.fields_select.names()
+        self.field_names = self.query.fields_select.value_field_names()
 
     async def has_more(self):
         """Return true if there are more results for this query
@@ -100,24 +174,77 @@ class Iterator(ListIterator, AsyncIterable):
         """
         https://docs.python.org/3/reference/datamodel.html#object.__aiter__
         """
+        async with aclosing(self.row_batches()) as batches:
+            async for rows in batches:
+                for row in rows:
+                    o = self.from_query(row)
+                    if self.filter(o):
+                        yield o
+
+    async def batches(self, size=None):
+        """Iterate the rows in lists instead of one at a time
+
+        :example:
+            async for foos in (await Foo.query.get()).batches(1000):
+                await reindex(foos)
+
+        :param size: int, the most rows in each list, defaults to the
+            cursor's arraysize
+        :returns: AsyncGenerator[list[Orm|tuple[Any]|Any]]
+        """
+        async with aclosing(self.row_batches(size)) as batches:
+            async for rows in batches:
+                batch = []
+                for row in rows:
+                    o = self.from_query(row)
+                    if self.filter(o):
+                        batch.append(o)
+
+                if batch:
+                    yield batch
+
+    async def rows(self):
+        """Iterate the raw rows of the cursor, the cursor is closed when the
+        rows are exhausted
+
+        :returns: AsyncGenerator[Mapping]
+        """
+        async with aclosing(self.row_batches()) as batches:
+            async for rows in batches:
+                for row in rows:
+                    yield row
+
+    async def row_batches(self, size=None):
+        """Iterate the raw rows of the cursor using .fetchmany, this only
+        awaits the cursor once for every size rows instead of once for every
+        row
+
+        :param size: int, how many rows to fetch at once, defaults to the
+            cursor's arraysize
+        :returns: AsyncGenerator[list[Mapping]]
+        """
         if self._cursor_exhausted:
             raise ValueError("Cursor has been exhausted, rerun the query")
 
-        cursor_i = 0
-        cursor_limit = -1
+        cursor = self._cursor
+        size = size or getattr(cursor, "arraysize", 0) or 500
+
+        # pagination fetches an extra row that shouldn't be returned
+        remaining = None
         if self.query.bounds.has_more():
-            cursor_limit = self.query.bounds.limit
+            remaining = self.query.bounds.limit
 
         try:
-            async for row in self._cursor:
-                if cursor_limit > 0 and cursor_i >= cursor_limit:
+            while remaining != 0:
+                rows = await cursor.fetchmany(size)
+                if not rows:
                     break
 
-                o = self.from_query(row)
-                if self.filter(o):
-                    yield o
+                if remaining is not None:
+                    rows = rows[:remaining]
+                    remaining -= len(rows)
 
-                cursor_i += 1
+                yield rows
 
         finally:
             await self.close()
@@ -235,26 +362,7 @@ class Iterator(ListIterator, AsyncIterable):
             If the query selected one field then just that value will be
             returned
         """
-        r = None
-        orm_class = self.orm_class
-        if self.field_names:
-            field_vals = []
-            for field_name in self.field_names:
-                fv = d[field_name]
-                if orm_class:
-                    field = orm_class.schema.fields[field_name]
-                    fv = field.from_interface(None, fv)
-                field_vals.append(fv)
-            r = field_vals if len(self.field_names) > 1 else field_vals[0]
-
-        else:
-            if orm_class:
-                r = orm_class.from_query(d)
-
-            else:
-                r = d
-
-        return r
+        return hydrate_row(self.orm_class, self.field_names, d)
 
 
 class QueryBounds(object):
@@ -406,7 +514,27 @@ class QueryBounds(object):
 
 
 class QueryField(object):
-    """Holds information for a field in the query"""
+    """Holds information for a field in the query
+
+    A query creates one of these for every field it touches, so this uses
+    __slots__ to keep each instance small and cheap to create
+    """
+    __slots__ = (
+        "query",
+        "name",
+        "value",
+        "operator",
+        "is_list",
+        "direction",
+        "increment",
+        "raw",
+        "clause",
+        "function_name",
+        "alias",
+        "or_clause",
+        "kwargs",
+    )
+
     @property
     def schema(self):
         return self.query.schema if self.query else None
@@ -417,19 +545,34 @@ class QueryField(object):
         if schema:
             return getattr(schema, self.name, None)
 
-    def __init__(self, query, field_name, field_val=None, **kwargs):
+    def __init__(
+        self,
+        query,
+        field_name,
+        field_val=None,
+        *,
+        operator=None,
+        is_list=False,
+        direction=None, # 1 = ASC, -1 = DESC
+        increment=False, # Query.incr_field
+        raw=False,
+        clause="",
+        function_name="",
+        **kwargs
+    ):
         self.query = query
-        self.operator = kwargs.pop("operator", None)
-        self.is_list = kwargs.pop("is_list", False)
-        self.direction = kwargs.pop("direction", None) # 1 = ASC, -1 = DESC
-        self.increment = kwargs.pop("increment", False) # Query.incr_field
-        self.raw = kwargs.pop("raw", False)
-        self.clause = kwargs.pop("clause", "")
-        self.function_name = kwargs.pop("function_name", "")
+        self.operator = operator
+        self.is_list = is_list
+        self.direction = direction
+        self.increment = increment
+        self.raw = raw
+        self.clause = clause
+        self.function_name = function_name
+        self.alias = None
         self.or_clause = False
         self.kwargs = kwargs
 
-        if self.raw:
+        if raw:
             self.name = field_name
             self.value = field_val
 
@@ -437,6 +580,30 @@ class QueryField(object):
             self.set_name(field_name)
             self.set_value(field_val)
 
+    def copy(self, query=None):
+        """Returns a shallow copy of this field
+
+        The value is shared with the copy, the query api never modifies a
+        field value in place so this is safe for things like big in_ lists
+
+        :param query: Query, the query the copy will belong to, defaults to
+            this field's query
+        :returns: QueryField
+        """
+        instance = self.__class__.__new__(self.__class__)
+        for name in QueryField.__slots__:
+            setattr(instance, name, getattr(self, name))
+
+        if d := getattr(self, "__dict__", None):
+            # child classes that don't define __slots__
+            instance.__dict__.update(d)
+
+        instance.kwargs = dict(self.kwargs)
+        if query is not None:
+            instance.query = query
+
+        return instance
+
     def set_name(self, field_name):
         field_name, function_name = self.parse(field_name, self.schema)
 
@@ -466,10 +633,10 @@ class QueryField(object):
 
     def to_query_value(self, field_val):
         if sf := self.schema_field:
-            field_val = self.schema_field.to_query_value(self, field_val)
+            field_val = sf.to_query_value(self, field_val)
 
         else:
-            if self.schema:
+            if self.schema and self.name != "*":
                 raise KeyError(
                     f"Schema {self.schema} had no field {self.name}",
                 )
@@ -483,11 +650,15 @@ class QueryField(object):
     def parse(self, field_name, schema):
         function_name = ""
         if schema:
-            function_name = ""
-            m = re.match(r"^([^\(]+)\(([^\)]+)\)$", field_name)
-            if m:
-                function_name = m.group(1)
-                field_name = m.group(2)
+            if "(" in field_name:
+                m = re.match(r"^([^\(]+)\(([^\)]+)\)$", field_name)
+                if m:
+                    function_name = m.group(1)
+                    field_name = m.group(2)
+
+            if field_name == "*":
+                # eg, count(*)
+                return field_name, function_name
 
             try:
                 field_name = schema.field_name(field_name)
@@ -525,6 +696,8 @@ class QueryField(object):
 
 class QueryFields(list):
     """Holds all the QueryField instances for a given clause"""
+    __slots__ = ("field_names", "options")
+
     @property
     def fields(self):
         """Returns a dict of field_name: field_value"""
@@ -539,18 +712,39 @@ class QueryFields(list):
 
     def names(self):
         """Return all the field names in the order they were first seen"""
-        ret = []
-        seen = set()
-        for f in self:
-            if f.name not in seen:
-                ret.append(f.name)
-                seen.add(f.name)
+        return list(self.field_names.keys())
+
+    def value_field_names(self):
+        """Return the selected names (eg, an aggregate's alias) mapped to the
+        name of the schema field the returned value comes from
+
+        min and max return values of the field's type, other aggregates (eg,
+        sum or count) map to None since their values aren't of the field's
+        type
+
+        :returns: dict[str, str|None]
+        """
+        ret = {}
+        for field_name in self.field_names:
+            field = self.get_field(field_name)
+            if field.function_name:
+                if field.function_name.lower() in ("min", "max"):
+                    ret[field_name] = field.name
+
+                else:
+                    ret[field_name] = None
+
+            else:
+                ret[field_name] = field.name
+
         return ret
 
     def append(self, field):
         index = len(self)
         super().append(field)
-        self.field_names[field.name].append(index)
+        # a selected aggregate is returned under its alias (eg, sum_foo)
+        field_name = field.alias or field.name
+        self.field_names.setdefault(field_name, []).append(index)
         field.modify_query()
 
     def get_field(self, field_name):
@@ -577,10 +771,24 @@ class QueryFields(list):
     __delitem__ = __setitem__
 
     def clear(self):
-        self.field_names = defaultdict(list)
+        self.field_names = {}
         self.options = {}
         super().clear()
 
+    def copy(self, query=None):
+        """Returns a copy of this clause with copies of all the fields
+
+        :param query: Query, passed to QueryField.copy
+        :returns: QueryFields
+        """
+        instance = self.__class__.__new__(self.__class__)
+        list.extend(instance, (f.copy(query) for f in self))
+        instance.field_names = {
+            k: list(v) for k, v in self.field_names.items()
+        }
+        instance.options = dict(self.options)
+        return instance
+
     def todict(self):
         """Returns a dict of field_name: QueryField instance"""
         ret = {}
@@ -617,9 +825,16 @@ class Query(AsyncIterable):
     fields_select_class = QueryFields
     fields_where_class = QueryFields
     fields_sort_class = QueryFields
+    fields_group_class = QueryFields
+    fields_having_class = QueryFields
     bounds_class = QueryBounds
     iterator_class = Iterator
 
+    find_methods_cache = {}
+    """dict -- (class, method_name) keys with (field method name, field name)
+    values, this is shared by all the Query classes and is filled in by
+    .find_methods"""
+
     @property
     def interface(self):
         return self.orm_class.interface if self.orm_class else None
@@ -698,6 +913,8 @@ class Query(AsyncIterable):
         self.fields_select = self.fields_select_class()
         self.fields_where = self.fields_where_class()
         self.fields_sort = self.fields_sort_class()
+        self.fields_group = self.fields_group_class()
+        self.fields_having = self.fields_having_class()
         self.bounds = self.bounds_class()
         self.compounds = []
 
@@ -739,6 +956,10 @@ class Query(AsyncIterable):
 
         :returns: tuple[str, str], (<FIELD_METHOD>, <FIELD_NAME>)
         """
+        key = (self.__class__, method_name)
+        if names := self.find_methods_cache.get(key, None):
+            return getattr(self, names[0]), names[1]
+
         # infinite recursion check, if a *_field method gets in here then it
         # doesn't exist
         if method_name.endswith("_field"):
@@ -773,6 +994,7 @@ class Query(AsyncIterable):
                         f"No field method derived from {method_name}",
                     )
 
+        self.find_methods_cache[key] = (field_method_name, field_name)
         return field_method, field_name
 
     def __getattr__(self, method_name):
@@ -782,14 +1004,7 @@ class Query(AsyncIterable):
             *_field method and passes in <FIELD_NAME> to the *_field method
         """
         field_method, field_name = self.find_methods(method_name)
-
-        def callback(*args, **kwargs):
-            if field_method:
-                ret = field_method(field_name, *args, **kwargs)
-
-            return ret
-
-        return callback
+        return functools.partial(field_method, field_name)
 
     def create_field(self, field_name, field_val=None, **kwargs):
         """Creates a QueryField instance"""
@@ -840,7 +1055,9 @@ class Query(AsyncIterable):
 
         used to be named sort_field
 
-        :param field_name: string, the field to sort on
+        :param field_name: string, the field to sort on, this can also be the
+            alias of a selected aggregate (eg, "sum_foo") or use the function
+            syntax (eg, "sum(foo)")
         :param direction: integer, negative for DESC, positive for ASC
         :param field_val: list, the order the rows should be returned in
         """
@@ -853,6 +1070,16 @@ class Query(AsyncIterable):
         else:
             raise ValueError("direction {} is undefined".format(direction))
 
+        # a selected aggregate can be sorted by its alias (eg, "sum_foo")
+        select_field = self.fields_select.get_field(field_name)
+        if select_field and select_field.function_name:
+            field_name = "{}({})".format(
+                select_field.function_name,
+                select_field.name,
+            )
+            if select_field.kwargs.get("distinct", False):
+                kwargs.setdefault("distinct", True)
+
         kwargs["direction"] = direction
         kwargs["is_list"] = True
         kwargs["clause"] = "sort"
@@ -885,6 +1112,92 @@ class Query(AsyncIterable):
             self.select_field(field_name, **kwargs)
         return self
 
+    def append_aggregate(self, function_name, field_name, **kwargs):
+        """Internal method that selects an aggregate of field_name
+
+        :param function_name: str, the aggregate function (eg, "sum")
+        :param field_name: str, the field to aggregate, "*" is all rows
+        :keyword alias: str, the name the value will be returned as, defaults
+            to <FUNCTION_NAME>_<FIELD_NAME> (eg, "sum_foo")
+        :keyword distinct: bool, only aggregate the distinct values
+        """
+        alias = kwargs.pop("alias", None)
+        kwargs["clause"] = "select"
+        kwargs["function_name"] = function_name
+        field = self.create_field(field_name, **kwargs)
+        if field.name == "*":
+            field.alias = alias or function_name
+
+        else:
+            field.alias = alias or f"{function_name}_{field.name}"
+
+        self.fields_select.append(field)
+        return self
+
+    def sum_field(self, field_name, **kwargs):
+        """SELECT sum(<FIELD_NAME>) AS sum_<FIELD_NAME>"""
+        return self.append_aggregate("sum", field_name, **kwargs)
+
+    def avg_field(self, field_name, **kwargs):
+        """SELECT avg(<FIELD_NAME>) AS avg_<FIELD_NAME>"""
+        return self.append_aggregate("avg", field_name, **kwargs)
+
+    def min_field(self, field_name, **kwargs):
+        """SELECT min(<FIELD_NAME>) AS min_<FIELD_NAME>"""
+        return self.append_aggregate("min", field_name, **kwargs)
+
+    def max_field(self, field_name, **kwargs):
+        """SELECT max(<FIELD_NAME>) AS max_<FIELD_NAME>"""
+        return self.append_aggregate("max", field_name, **kwargs)
+
+    def count_field(self, field_name="*", **kwargs):
+        """SELECT count(<FIELD_NAME>) AS count_<FIELD_NAME>
+
+        :example:
+            q.count_field() # count(*) AS count
+            q.count_foo(distinct=True) # count(DISTINCT foo) AS count_foo
+        """
+        return self.append_aggregate("count", field_name, **kwargs)
+
+    def group_field(self, field_name, **kwargs):
+        """GROUP BY <FIELD_NAME>, this is automatically called when you do
+        group_FIELDNAME()"""
+        kwargs["clause"] = "group"
+        field = self.create_field(field_name, **kwargs)
+        self.fields_group.append(field)
+        return self
+
+    def group_by(self, *field_names, **kwargs):
+        """the many version of .group_field
+
+        :example:
+            # SELECT bar, sum(foo) AS sum_foo ... GROUP BY bar
+            q.select_bar().sum_foo().group_by("bar")
+        """
+        for field_name in make_list(field_names):
+            self.group_field(field_name, **kwargs)
+        return self
+
+    def having(self, field_name, operator, field_val=None, **kwargs):
+        """HAVING <FIELD_NAME> <OPERATOR> <FIELD_VALUE>
+
+        :example:
+            q.select_bar().sum_foo().group_bar().having("sum(foo)", "gt", 10)
+
+        :param field_name: str, usually an aggregate using function syntax
+            (eg, "sum(foo)" or "count(*)")
+        :param operator: str, any of the where operators (eg, "eq", "gt")
+        :param field_val: Any
+        """
+        if operator in ("in", "nin"):
+            kwargs["is_list"] = True
+
+        kwargs["operator"] = operator
+        kwargs["clause"] = "having"
+        f = self.create_field(field_name, field_val, **kwargs)
+        self.fields_having.append(f)
+        return self
+
     def set_field(self, field_name, field_val, **kwargs):
         """Set a field into .fields_set attribute
 
@@ -1159,11 +1472,35 @@ class Query(AsyncIterable):
         return self
 
     def copy(self):
-        """nice handy wrapper around the deepcopy"""
-        return copy.deepcopy(self)
+        """Returns a copy of this query that can be modified without changing
+        this query
+
+        This is a structural copy, the clauses, bounds, and compounds are
+        duplicated but the field values (eg, a big in_ list or a subquery) are
+        shared between the two queries. Use copy.deepcopy if you need the
+        values copied also
+
+        :returns: Query
+        """
+        instance = self.__class__.__new__(self.__class__)
+        ignore_keys = set(["_interface", "interface"])
+        for key, val in self.__dict__.items():
+            if key not in ignore_keys:
+                if isinstance(val, QueryFields):
+                    val = val.copy(instance)
+
+                elif isinstance(val, (QueryBounds, list)):
+                    val = copy.copy(val)
+
+                instance.__dict__[key] = val
+
+        return instance
 
     def __deepcopy__(self, memodict={}):
         instance = type(self)(self.orm_class)
+        # the QueryField instances point back to this query, so register the
+        # copy to keep them from each creating another copy of this query
+        memodict[id(self)] = instance
         ignore_keys = set(["_interface", "interface"])
         for key, val in self.__dict__.items():
             if key not in ignore_keys:
@@ -1204,6 +1541,200 @@ class Query(AsyncIterable):
         iterator = await self.get(**kwargs)
         return await iterator.tolist()
 
+    @classmethod
+    async def gather(cls, *queries, **kwargs) -> list:
+        """Run independent read queries concurrently, see Interface.gather
+
+        :example:
+            foo_count, bars = await Query.gather(
+                Foo.query.eq_baz(1).count(),
+                Bar.query.lt_baz(10),
+            )
+
+        :param *queries: Awaitable|Query, the interface of the first Query
+            will be used, if there aren't any Query instances then the
+            default interface is used
+        :keyword interface: Interface
+        :param **kwargs: passed through to Interface.gather
+        :returns: list, the result of each query
+        """
+        interface = kwargs.pop("interface", None)
+        if not interface:
+            for query in queries:
+                if isinstance(query, Query) and query.interface:
+                    interface = query.interface
+                    break
+
+            else:
+                interface = get_interface()
+
+        return await interface.gather(*queries, **kwargs)
+
+    async def partitions(self, n, method="range") -> list:
+        """Split this query into n queries that each cover a different part
+        of the primary keys, together they return the same rows as this query
+
+        :param n: int, how many queries to split this query into, fewer
+            queries can be returned if there aren't enough rows
+        :param method: str, either "range", which finds the smallest and
+            largest primary keys matching this query and splits that range
+            into n contiguous ranges, or "modulo", which uses pk % n and needs
+            an integer primary key
+        :returns: list[Query]
+        """
+        if n < 1:
+            raise ValueError(f"Can't split a query into {n} partitions")
+
+        if self.bounds:
+            raise ValueError("A query with bounds can't be partitioned")
+
+        pk_name = self.schema.pk_name if self.schema else None
+        if not pk_name:
+            raise ValueError("A query needs a primary key to be partitioned")
+
+        if n == 1:
+            return [self.copy()]
+
+        if method == "modulo":
+            format_str = self.interface.render_modulo_sql(pk_name)
+            return [self.copy().raw_field(format_str, n, i) for i in range(n)]
+
+        elif method != "range":
+            raise ValueError(f"Unknown partition method {method}")
+
+        q = self.copy()
+        q.fields_sort = self.fields_sort_class()
+        q.fields_select = self.fields_select_class()
+        q.select_field(pk_name)
+
+        lowest = await q.copy().asc_field(pk_name).one()
+        if lowest is None:
+            return [self.copy()]
+
+        if isinstance(lowest, int):
+            highest = await q.copy().desc_field(pk_name).one()
+            size = highest - lowest + 1
+            boundaries = [lowest + (size * i // n) for i in range(1, n)]
+
+        else:
+            # pks that can't be split arithmetically (eg, UUIDs) are split
+            # using the row counts instead, this is slower since each offset
+            # has to be scanned
+            count = await q.copy().count()
+            boundaries = []
+            for i in range(1, n):
+                boundary = await q.copy().asc_field(pk_name).offset(
+                    count * i // n
+                ).one()
+                if boundary is not None:
+                    boundaries.append(boundary)
+
+        # small ranges can produce the same boundary more than once
+        boundaries = sorted(set(b for b in boundaries if b > lowest))
+
+        queries = []
+        previous = None
+        for boundary in boundaries:
+            partition = self.copy().lt_field(pk_name, boundary)
+            if previous is not None:
+                partition.gte_field(pk_name, previous)
+            queries.append(partition)
+            previous = boundary
+
+        partition = self.copy()
+        if previous is not None:
+            partition.gte_field(pk_name, previous)
+        queries.append(partition)
+
+        return queries
+
+    async def partitioned(self, n, **kwargs):
+        """Iterate the rows of this query using n partitions (see
+        .partitions) that are queried concurrently
+
+        Rows are yielded as soon as any partition returns them, so the
+        query's sort order is only kept within each partition
+
+        :example:
+            async for foo in Foo.query.gt_updated(since).partitioned(4):
+                await reindex(foo)
+
+        .. note:: Inside a transaction the partitions that share an interface
+            are queried one at a time
+
+        :param n: int, how many partitions to split this query into
+        :keyword method: str, see .partitions
+        :keyword interfaces: list[Interface], partition i will use
+            interfaces[i % len(interfaces)], pass in interfaces with their
+            own connections (eg, replicas) to scan the partitions in parallel,
+            defaults to this query's interface
+        :keyword queue_size: int, how many rows can be waiting on the caller
+            before the partitions stop fetching
+        :param **kwargs: passed through to Interface.get
+        :returns: AsyncGenerator[Orm|Any]
+        """
+        queries = await self.partitions(
+            n,
+            method=kwargs.pop("method", "range"),
+        )
+        interfaces = kwargs.pop("interfaces", None) or [self.interface]
+        queue = asyncio.Queue(kwargs.pop("queue_size", 1000))
+        done = object()
+
+        # partitions that share a connection in a transaction are ran one at
+        # a time, see Interface.gather
+        locks = {}
+        for interface in interfaces:
+            if id(interface) not in locks:
+                async with interface.connection() as connection:
+                    if interface.in_transaction(connection):
+                        locks[id(interface)] = asyncio.Lock()
+
+                    else:
+                        locks[id(interface)] = nullcontext()
+
+        async def fetch(i, query):
+            interface = interfaces[i % len(interfaces)]
+            async with locks[id(interface)]:
+                cursor = await interface.get(
+                    query.schema,
+                    query,
+                    cursor_result=True,
+                    **kwargs
+                )
+                async for row in query.create_iterator(cursor):
+                    await queue.put(row)
+
+        async def run():
+            try:
+                async with asyncio.TaskGroup() as tg:
+                    for i, query in enumerate(queries):
+                        tg.create_task(fetch(i, query))
+
+            except ExceptionGroup as eg:
+                await queue.put(done)
+                raise eg.exceptions[0]
+
+            await queue.put(done)
+
+        task = asyncio.create_task(run())
+        try:
+            while (row := await queue.get()) is not done:
+                yield row
+
+            # raises the partition error if there was one
+            await task
+
+        finally:
+            if not task.done():
+                # the caller stopped iterating early
+                task.cancel()
+                try:
+                    await task
+
+                except asyncio.CancelledError:
+                    pass
+
     async def raw(self, query_str, *query_args, **kwargs):
         """Send a raw query to the interface without any processing
 
@@ -1248,8 +1779,12 @@ class Query(AsyncIterable):
         ret = None
 
         kwargs["paginate"] = False
-        async for ret in await self.limit(1).get(**kwargs):
-            break
+        iterator = await self.limit(1).get(**kwargs)
+        # we close the generator ourselves so the cursor isn't left open
+        # until the generator is garbage collected
+        async with aclosing(aiter(iterator)) as rows:
+            async for ret in rows:
+                break
 
         return ret
 
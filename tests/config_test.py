@@ -161,6 +161,30 @@ class SchemaTest(IsolatedAsyncioTestCase):
         for fn in ["foo", "che"]:
             self.assertFalse(fn in pfields)
 
+    def test_views_cache(self):
+        s = self.get_schema(
+            foo=Field(str, persist=False),
+            bar=Field(str),
+        )
+
+        pfields = s.persisted_fields
+        self.assertTrue(pfields is s.persisted_fields)
+        with self.assertRaises(TypeError):
+            pfields["foo"] = s.foo
+
+        pk_names = s.pk_names
+        self.assertEqual(("_id",), pk_names)
+        self.assertTrue(pk_names is s.pk_names)
+
+        s.set_field("che", Field(int))
+        self.assertFalse(pfields is s.persisted_fields)
+        self.assertTrue("che" in s.persisted_fields)
+        self.assertFalse("che" in pfields)
+
+        pfields = s.persisted_fields
+        s.set_index("foo_bar", Index("foo", "bar"))
+        self.assertFalse(pfields is s.persisted_fields)
+
 
 class DsnConnectionTest(IsolatedAsyncioTestCase):
     """Any general tests should go here and always use sqlite because that's
@@ -195,6 +219,16 @@ class DsnConnectionTest(IsolatedAsyncioTestCase):
         c = DsnConnection(dsn)
         self.assertTrue(c.readonly)
 
+    def test_replica(self):
+        c = DsnConnection("SQLite:///tmp/sqlite.db?replica=1#i1")
+        self.assertTrue(c.replica)
+        self.assertTrue(c.readonly)
+        self.assertEqual("i1", c.name)
+
+        c = DsnConnection("SQLite:///tmp/sqlite.db#i1")
+        self.assertFalse(c.replica)
+        self.assertFalse(c.readonly)
+
     def test_bad_classpath(self):
         dsn = 'bogus.earaskdfaksfk.Interface://host/dbname#bogus2'
         with self.assertRaises(ImportError):
@@ -429,6 +463,18 @@ class FieldTest(EnvironTestCase):
         fields2 = o.to_interface()
         self.assertLess(fields["foo"], fields2["foo"])
 
+    def test_lifecycle_logging(self):
+        orm_class = self.get_orm_class(foo=Field(int))
+
+        with self.assertLogs("prom.config", level="DEBUG") as cm:
+            o = orm_class(foo=1)
+            o.to_interface()
+            o.jsonable()
+
+        output = "\n".join(cm.output)
+        for method_name in ["to_value", "to_interface", "jsonable"]:
+            self.assertIn(f"{orm_class.__name__}.foo.{method_name}", output)
+
     def test_qset(self):
         class IqueryOrm(Orm):
             foo = Field(int)
@@ -643,6 +643,50 @@ class _BaseTestInterface(IsolatedAsyncioTestCase):
         r = await i.update(s, d, q, ignore_result=True)
         self.assertIsNone(r)
 
+    async def test_insert_many(self):
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(str, False),
+        )
+
+        rows = [{"foo": foo, "bar": f"value {foo}"} for foo in range(5)]
+        rows.insert(2, {"foo": 100})
+        rds = await i.insert_many(s, rows, batch_size=2)
+        self.assertEqual(6, len(rds))
+        for fields, rd in zip(rows, rds):
+            self.assertEqual(fields["foo"], rd["foo"])
+            self.assertLess(0, rd["_id"])
+
+        self.assertEqual(6, await i.count(s, Query()))
+
+        r = await i.insert_many(s, rows, ignore_result=True)
+        self.assertIsNone(r)
+        self.assertEqual(12, await i.count(s, Query()))
+
+    async def test_update_many(self):
+        i, s = await self.create_table()
+        pks = await self.insert(i, s, 5)
+
+        rows = [{"_id": pk, "foo": 100 + pk} for pk in pks[:3]]
+        rows.append({"_id": pks[3], "foo": 200, "bar": "value 200"})
+        rows.append({"_id": pks[4]}) # nothing to update
+        rds = await i.update_many(s, rows, batch_size=2)
+        self.assertEqual(4, len(rds))
+
+        for pk in pks[:3]:
+            gd = await i.one(s, Query().eq__id(pk))
+            self.assertEqual(100 + pk, gd["foo"])
+
+        gd = await i.one(s, Query().eq__id(pks[3]))
+        self.assertEqual(200, gd["foo"])
+        self.assertEqual("value 200", gd["bar"])
+
+        r = await i.update_many(s, rows[:1], ignore_result=True)
+        self.assertIsNone(r)
+
+        with self.assertRaises(ValueError):
+            await i.update_many(s, [{"foo": 1}])
+
     async def test_ref_strong(self):
         i = self.get_interface()
         s_1 = self.get_schema(
@@ -752,6 +796,175 @@ class _BaseTestInterface(IsolatedAsyncioTestCase):
         s.set_field("che", Field(str, False))
         self.assertTrue(await i._handle_field_error(s, e=None))
 
+    async def test_set_tables(self):
+        i = self.get_interface()
+        s1 = self.get_schema(
+            foo=Field(int, True),
+            ifoo=Index("foo"),
+        )
+        s2 = self.get_schema(
+            bar=Field(int, True),
+            s1_id=Field(s1, True),
+        )
+        s3 = self.get_schema(
+            che=Field(str, True),
+            s2_id=Field(s2, False),
+            s3_id=Field(str, False),
+        )
+        # a reference to itself shouldn't recurse forever
+        s3.fields["s3_id"].schema = s3
+
+        # s1 is added because s2 references it
+        schemas = await i.set_tables([s3, s2])
+        self.assertEqual(
+            [s1.table_name, s2.table_name, s3.table_name],
+            [s.table_name for s in schemas],
+        )
+        for s in [s1, s2, s3]:
+            self.assertTrue(await i.has_table(s))
+        self.assertTrue(["foo"] in (await i.get_indexes(s1)).values())
+
+        self.assertEqual([], await i.set_tables([s1, s2, s3]))
+
+        await i.unsafe_delete_table(s3)
+        schemas = await i.set_tables([s3])
+        self.assertEqual([s3.table_name], [s.table_name for s in schemas])
+
+    async def test_set_index_concurrently(self):
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(int, True),
+            ifoo=Index("foo", concurrently=True),
+        )
+        await self.insert(i, s, 5)
+        self.assertTrue(["foo"] in (await i.get_indexes(s)).values())
+
+        await i.set_index(s, "ibar", ["bar"], concurrently=True)
+        self.assertTrue(["bar"] in (await i.get_indexes(s)).values())
+
+        # inside a transaction the index is created normally
+        async with i.transaction():
+            await i.set_index(s, "ifoobar", ["foo", "bar"], concurrently=True)
+        indexes = await i.get_indexes(s)
+        self.assertTrue(["foo", "bar"] in indexes.values())
+
+    async def test_set_index_partial_expression(self):
+        i, s = await self.create_table(
+            foo=Field(str, True),
+            bar=Field(int, False),
+            ifoo=Index("lower(foo)", unique=True, where=Query().eq_bar(None)),
+        )
+
+        await i.insert(s, {"foo": "FOO"})
+        with self.assertRaises(prom.UniqueError):
+            await i.insert(s, {"foo": "foo"})
+
+        # rows that don't match the where clause aren't in the index
+        await i.insert(s, {"foo": "foo", "bar": 1})
+        await i.insert(s, {"foo": "foo", "bar": 2})
+
+        sql = i.render_set_index_sql(
+            s,
+            "ibar",
+            ["bar"],
+            where=Query().eq_foo("it's").gt_bar(1),
+        )
+        self.assertTrue("'it''s'" in sql)
+        self.assertFalse(i.PLACEHOLDER in sql)
+
+        await i.set_index(s, "ibar", ["bar"], where=Query().eq_foo("it's"))
+        self.assertEqual(2, await i.count(s, Query().eq_foo("foo").gt_bar(0)))
+
+    async def test_set_index_include(self):
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(str, True),
+            ifoo=Index("foo", include=["bar"]),
+        )
+        self.assertTrue(["foo", "bar"] in (await i.get_indexes(s)).values())
+
+        await self.insert(i, s, 5)
+        q = Query().select_bar().gt_foo(0)
+        self.assertEqual(5, len(await i.get(s, q)))
+
+    async def test_schema_cache(self):
+        i, s = await self.create_table()
+        self.assertTrue(i.get_schema_cache(s)["exists"])
+
+        fields = await i.get_fields(s)
+        self.assertTrue("foo" in fields)
+        self.assertEqual(fields, i.get_schema_cache(s)["fields"])
+
+        # changes made outside of prom aren't seen until the cache is cleared
+        await i.raw(f"ALTER TABLE {s} ADD COLUMN che INTEGER")
+        self.assertFalse("che" in await i.get_fields(s))
+        i.clear_schema_cache(s)
+        self.assertTrue("che" in await i.get_fields(s))
+
+        # an out of date cache is refreshed when handling a field error
+        s.set_field("baz", Field(str, False))
+        self.assertTrue(await i._handle_field_error(s, e=None))
+        self.assertFalse("fields" in i.get_schema_cache(s))
+        self.assertTrue("baz" in await i.get_fields(s))
+
+        indexes = await i.get_indexes(s)
+        await i.set_index(s, "baz_index", ["baz"])
+        self.assertEqual(len(indexes) + 1, len(await i.get_indexes(s)))
+
+        # a rollback forgets the tables changed in the transaction
+        with self.assertRaises(ValueError):
+            async with i.transaction():
+                await i.set_index(s, "che_index", ["che"])
+                await i.get_indexes(s)
+                raise ValueError()
+        self.assertFalse(i.get_schema_cache(s))
+
+        self.assertTrue(await i.has_table(s))
+        await i.unsafe_delete_table(s)
+        self.assertFalse(await i.has_table(s))
+        self.assertFalse(i.get_schema_cache(s))
+
+    async def test_schema_cache_rollback(self):
+        i = self.get_interface()
+        s1 = self.get_schema(
+            foo=Field(int, True),
+        )
+        s2 = self.get_schema(
+            bar=Field(int, True),
+            s_pk=Field(s1),
+        )
+        await i.set_table(s1)
+        await i.set_table(s2)
+
+        pk1 = (await i.insert(s1, {"foo": 1}))["_id"]
+        pk2 = (await i.insert(s2, {"bar": 2, "s_pk": pk1}))["_id"]
+
+        # rollbacks without table changes leave the cache alone
+        with self.assertRaises(prom.UniqueError):
+            await i.insert(s2, {"_id": pk2, "bar": 3, "s_pk": pk1})
+
+        with self.assertRaises(ValueError):
+            async with i.transaction() as connection:
+                await i.update(
+                    s2,
+                    {"bar": 4},
+                    Query().eq__id(pk2),
+                    connection=connection,
+                )
+                raise ValueError()
+
+        self.assertTrue(i.get_schema_cache(s1)["exists"])
+        self.assertTrue(i.get_schema_cache(s2)["exists"])
+
+        # so the foreign key table isn't looked up again when the table has
+        # to be created
+        await i.raw(f"DROP TABLE {s2}", ignore_result=True)
+        i.clear_schema_cache(s2)
+        with self.assertLogs("prom.interface.sql", level="DEBUG") as cm:
+            await i.insert(s2, {"bar": 5, "s_pk": pk1})
+        self.assertFalse(any("Verifying" in m for m in cm.output))
+        self.assertTrue(any("foreign key table" in m for m in cm.output))
+
     async def test_handle_error_column(self):
         i, s = await self.create_table()
         s.set_field("che", Field(str, True)) # it's required
@@ -814,6 +1027,23 @@ class _BaseTestInterface(IsolatedAsyncioTestCase):
         r = await i.one(s, Query().eq_bar(1).ne_foo(None))
         self.assertEqual(pk1, r['_id'])
 
+    async def test_pipeline(self):
+        i, s = await self.create_table()
+
+        async with i.pipeline() as conn:
+            for foo in range(5):
+                await i.insert(
+                    s,
+                    {"foo": foo, "bar": f"value {foo}"},
+                    ignore_result=True,
+                    connection=conn,
+                )
+
+            d = await i.insert(s, {"foo": 5, "bar": "value 5"})
+            self.assertEqual(5, d["foo"])
+
+        self.assertEqual(6, await i.count(s, Query()))
+
     async def test_transaction_error(self):
         i = self.get_interface()
         with self.assertRaises(RuntimeError):
@@ -1329,6 +1559,34 @@ class _BaseTestInterface(IsolatedAsyncioTestCase):
         self.assertEqual(2, d["baz"])
         self.assertEqual(r["_id"], d["_id"])
 
+    async def test_upsert_many(self):
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(str, True),
+            ifoo=Index("foo", unique=True),
+        )
+
+        pk = (await i.insert(s, {"foo": 1, "bar": "bar 1"}))["_id"]
+
+        rows = [{"foo": foo, "bar": f"bar {foo}u"} for foo in range(1, 6)]
+        # the same conflict value twice in one batch, the last one wins
+        rows.append({"foo": 5, "bar": "bar 5uu"})
+        rs = await i.upsert_many(s, rows, ["foo"], batch_size=2)
+        self.assertEqual(5, len(rs))
+        self.assertEqual(5, await i.count(s, Query()))
+
+        d = await i.one(s, Query().eq_foo(1))
+        self.assertEqual(pk, d["_id"])
+        self.assertEqual("bar 1u", d["bar"])
+
+        d = await i.one(s, Query().eq_foo(5))
+        self.assertEqual("bar 5uu", d["bar"])
+
+        self.assertEqual([], await i.upsert_many(s, [], ["foo"]))
+
+        with self.assertRaises(ValueError):
+            await i.upsert_many(s, [{"bar": "bar 7"}], ["foo"])
+
     async def test_stacktraces(self):
         i, s = await self.create_table(
             foo=Field(str, True),
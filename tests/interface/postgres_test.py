@@ -160,6 +160,101 @@ class InterfaceTest(_BaseTestInterface):
         for k, v in d.items():
             self.assertEqual(v, odb[k])
 
+    async def test_render_set_index_sql_concurrently(self):
+        i, s = await self.create_table()
+
+        sql = i.render_set_index_sql(s, "ifoo", ["foo"], concurrently=True)
+        self.assertTrue("INDEX CONCURRENTLY IF NOT EXISTS" in sql)
+
+        async with i.transaction() as conn:
+            sql = i.render_set_index_sql(
+                s,
+                "ifoo",
+                ["foo"],
+                concurrently=True,
+                connection=conn,
+            )
+            self.assertFalse("CONCURRENTLY" in sql)
+
+    async def test_set_index_concurrently_failed(self):
+        """a failed concurrent build shouldn't leave an invalid index behind
+        that IF NOT EXISTS would keep forever"""
+        i, s = await self.create_table(foo=Field(int, True))
+        await i.insert(s, {"foo": 1})
+        await i.insert(s, {"foo": 1})
+
+        with self.assertRaises(prom.InterfaceError):
+            await i.set_index(
+                s,
+                "ifoo",
+                ["foo"],
+                unique=True,
+                concurrently=True,
+            )
+
+        query_str = "SELECT indexname FROM pg_indexes WHERE indexname = %s"
+        self.assertFalse(await i.raw(query_str, f"{s}_ifoo"))
+
+        await i.delete(s, Query().eq__id(2))
+        await i.set_index(s, "ifoo", ["foo"], unique=True, concurrently=True)
+        rows = await i.raw(
+            "SELECT indisvalid FROM pg_index WHERE indexrelid = %s::regclass",
+            f"\"{s}_ifoo\"",
+        )
+        self.assertTrue(rows[0]["indisvalid"])
+
+    async def test_set_index_include_postgres(self):
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(str, True),
+        )
+
+        sql = i.render_set_index_sql(s, "ifoo", ["foo"], include=["bar"])
+        self.assertTrue('("foo")\nINCLUDE ("bar")' in sql)
+
+        await i.set_index(s, "ifoo", ["foo"], include=["bar"], unique=True)
+        await i.insert(s, {"foo": 1, "bar": "one"})
+        with self.assertRaises(prom.UniqueError):
+            await i.insert(s, {"foo": 1, "bar": "two"})
+
+    async def test_update_many_typed_values(self):
+        """the VALUES placeholders need the table's types or Postgres will
+        resolve them as text and the UPDATE will fail"""
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(datetime.datetime, True),
+            che=Field(dict, True),
+        )
+        dt = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        pks = []
+        for x in range(3):
+            d = await i.insert(s, {"foo": x, "bar": dt, "che": {"x": x}})
+            pks.append(d["_id"])
+
+        dt2 = datetime.datetime(2021, 1, 1, tzinfo=datetime.timezone.utc)
+        rows = [
+            {"_id": pk, "foo": 100 + x, "bar": dt2, "che": {"y": x}}
+            for x, pk in enumerate(pks)
+        ]
+        rds = await i.update_many(s, rows)
+        self.assertEqual(3, len(rds))
+
+        for x, pk in enumerate(pks):
+            gd = await i.one(s, Query().eq__id(pk))
+            self.assertEqual(100 + x, gd["foo"])
+            self.assertEqual(dt2, gd["bar"])
+            self.assertEqual({"y": x}, gd["che"])
+
+    async def test_partitions_modulo(self):
+        orm_class = self.get_orm_class(interface=self.get_interface())
+        pks = await self.insert(orm_class, 10)
+
+        qs = await orm_class.query.partitions(3, method="modulo")
+        rpks = []
+        for q in qs:
+            rpks.extend(await q.select_pk().tolist())
+        self.assertEqual(sorted(pks), sorted(rpks))
+
     async def test_render_sql_eq(self):
         orm_class = self.get_orm_class(
             ts=Field(datetime.datetime, True),
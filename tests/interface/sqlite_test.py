@@ -7,8 +7,9 @@ from prom.interface.sqlite import SQLite
 from prom import query, InterfaceError
 from prom.interface.sqlite import SQLite, DatetimeType
 from prom.interface import configure, set_interface, get_interface
+from prom.interface.sharded import ShardedInterface
 from prom.model import Orm
-from prom.config import Field, DsnConnection
+from prom.config import Field, DsnConnection, Index
 from prom.compat import *
 from prom.query import Query
 
@@ -356,6 +357,57 @@ class InterfaceTest(_BaseTestInterface):
         _id = (await self.insert(i, s, 1))
         self.assertTrue(_id)
 
+    async def test_set_index_include(self):
+        i, s = await self.create_table(
+            foo=Field(int, True),
+            bar=Field(str, True),
+            ifoo=Index("foo", include=["bar"]),
+            ibar=Index("bar", include=["foo"], unique=True),
+        )
+
+        # the included field is appended to the non-unique index
+        indexes = list((await i.get_indexes(s)).values())
+        self.assertTrue(["foo", "bar"] in indexes)
+        self.assertTrue(["bar"] in indexes)
+
+        rows = await i.raw(
+            f"EXPLAIN QUERY PLAN SELECT bar FROM {s} WHERE foo > 0"
+        )
+        self.assertTrue("COVERING INDEX" in rows[0]["detail"])
+
+    async def test_replicas(self):
+        """The replica needs to be a different db so we can tell where the
+        reads go, so this uses separate in memory dbs"""
+        i = self.create_dsn_interface("sqlite://:memory:")
+        i, s = await self.create_table(interface=i)
+        r = self.create_dsn_interface("sqlite://:memory:")
+        await r.set_table(s)
+        await self.insert(r, s, 2)
+        i.add_replica(r)
+
+        self.assertEqual(2, await i.count(s, Query()))
+        async with i.transaction():
+            self.assertEqual(0, await i.count(s, Query()))
+
+        i.config.options["replica_stickiness"] = 60
+        await self.insert(i, s, 1)
+        self.assertEqual(1, await i.count(s, Query()))
+
+        i.config.options["replica_stickiness"] = 0
+        self.assertEqual(2, await i.count(s, Query()))
+
+        # the replica doesn't have this table so the primary takes over
+        i, s = await self.create_table(interface=i)
+        await self.insert(i, s, 3)
+        self.assertEqual(3, await i.count(s, Query()))
+
+        await i.close()
+        self.assertFalse(r.is_connected())
+
+    def test_configure_replica_no_primary(self):
+        with self.assertRaises(ValueError):
+            configure("sqlite://:memory:?replica=1#replicaprimary")
+
     async def test_get_fields_float(self):
         """I'm not completely sure what this is testing anymore but I'm sure it
         was a bug from some app that used ActiveRecord and I was trying to
@@ -370,3 +422,110 @@ class InterfaceTest(_BaseTestInterface):
         fields = await i.get_fields("ZFOOBAR")
         self.assertEqual(float, fields["ZFLOAT"]["field_type"])
 
+
+    async def test_sharded(self):
+        s1 = self.create_dsn_interface("sqlite://:memory:")
+        s2 = self.create_dsn_interface("sqlite://:memory:")
+        set_interface(s1, "shard1")
+        set_interface(s2, "shard2")
+        i = ShardedInterface("foo", "shard1", "shard2")
+
+        i, s = await self.create_table(
+            interface=i,
+            foo=Field(int),
+            bar=Field(str, False),
+        )
+        self.assertTrue(await i.has_table(s))
+
+        await i.insert_many(s, [{"foo": n, "bar": str(n)} for n in range(10)])
+        self.assertEqual(10, await i.count(s, Query()))
+        self.assertEqual(5, await s1.count(s, Query()))
+        self.assertEqual(5, await s2.count(s, Query()))
+
+        # only the shard that holds the shard key value is queried
+        self.assertEqual([s2], i.get_query_shards(Query().eq_foo(3)))
+        self.assertEqual(
+            [s1, s2],
+            i.get_query_shards(Query().in_foo([2, 3])),
+        )
+        self.assertEqual([], i.get_query_shards(Query().eq_foo(2).eq_foo(3)))
+        self.assertEqual("3", (await i.one(s, Query().eq_foo(3)))["bar"])
+
+        rows = await i.get(s, Query().desc_foo().limit(3).offset(2))
+        self.assertEqual([7, 6, 5], [r["foo"] for r in rows])
+
+        # the sort field doesn't have to be selected
+        rows = await i.get(s, Query().select_bar().desc_foo().limit(3))
+        self.assertEqual([{"bar": "9"}, {"bar": "8"}, {"bar": "7"}], rows)
+
+        rows = await i.get(s, Query().asc_foo().limit(4), cursor_result=True)
+        self.assertEqual(4, rows.rowcount)
+        self.assertEqual([0, 1, 2, 3], [r["foo"] async for r in rows])
+
+        r = await i.update(s, {"bar": "updated"}, Query().in_foo([1, 2]))
+        self.assertEqual(2, len(r))
+        self.assertEqual(
+            2,
+            await i.count(s, Query().eq_bar("updated")),
+        )
+
+        self.assertEqual(
+            3,
+            await i.delete(s, Query().lt_foo(3), count_result=True),
+        )
+        self.assertEqual(7, await i.count(s, Query()))
+        self.assertTrue(await i.has(s, Query().eq_foo(9)))
+        self.assertFalse(await i.has(s, Query().eq_foo(1)))
+
+    async def test_sharded_orm(self):
+        s1 = self.create_dsn_interface("sqlite://:memory:")
+        s2 = self.create_dsn_interface("sqlite://:memory:")
+        set_interface(s1, "shardorm1")
+        set_interface(s2, "shardorm2")
+        i = ShardedInterface("foo", "shardorm1", "shardorm2")
+
+        orm_class = self.get_orm_class(
+            interface=i,
+            _id=Field(str, True, pk=True),
+            foo=Field(int, True),
+            bar=Field(str, False),
+        )
+        await i.set_table(orm_class.schema)
+
+        # pks have to be unique across the shards
+        o1 = await orm_class.create(_id="o1", foo=1, bar="one")
+        o2 = await orm_class.create(_id="o2", foo=2, bar="two")
+        self.assertEqual(1, await s1.count(orm_class.schema, Query()))
+        self.assertEqual(1, await s2.count(orm_class.schema, Query()))
+
+        o = await orm_class.query.eq_foo(1).one()
+        self.assertEqual(o1.pk, o.pk)
+        o = await orm_class.query.eq_foo(2).one()
+        self.assertEqual(o2.pk, o.pk)
+
+        o2.bar = "two updated"
+        await o2.save()
+        o = await orm_class.query.eq_foo(2).one()
+        self.assertEqual("two updated", o.bar)
+
+        await o1.delete()
+        self.assertEqual(0, await s2.count(orm_class.schema, Query()))
+        self.assertEqual(1, await orm_class.query.count())
+
+        # aggregates are per shard so they can't be merged
+        await orm_class.create(_id="o3", foo=3, bar="three")
+        with self.assertRaises(ValueError):
+            await orm_class.query.sum_foo().tolist()
+
+        with self.assertRaises(ValueError):
+            await orm_class.query.select_bar().group_bar().tolist()
+
+        with self.assertRaises(ValueError):
+            await orm_class.query.group_bar().count()
+
+        with self.assertRaises(ValueError):
+            await orm_class.query.desc_field("sum(foo)").tolist()
+
+        # on one shard the db does the aggregating
+        r = await orm_class.query.eq_foo(3).sum_foo().one()
+        self.assertEqual(3, r)
@@ -687,6 +687,26 @@ class OrmTest(EnvironTestCase):
         self.assertFalse(o.nin_che("boo"))
         self.assertTrue(o.nin_che("bam"))
 
+    def test___getattr___cache(self):
+        orm_class = self.get_orm_class(foo=Field(int))
+        o = orm_class(foo=5)
+
+        self.assertTrue(o.eq_foo(5))
+        getters = orm_class.schema.lookup["getattr"]
+        self.assertEqual("get_method_value", getters["eq_foo"])
+
+        # the cached method should still be bound to the right instance
+        o2 = orm_class(foo=6)
+        self.assertTrue(o2.eq_foo(6))
+        self.assertFalse(o2.eq_foo(5))
+
+        with self.assertRaises(AttributeError):
+            o.eq_bar
+        self.assertFalse("eq_bar" in getters)
+
+        orm_class.schema.set_field("bar", Field(int))
+        self.assertEqual({}, getters)
+
     def test___getattr___error(self):
         class O4(Orm):
             @property
@@ -1346,6 +1366,186 @@ class OrmTest(EnvironTestCase):
         o2 = await o.requery()
         self.assertEqual(o.baz, o2.baz)
 
+    async def test_update_many(self):
+        orm_class = self.get_orm_class(
+            foo=Field(int, True),
+            bar=Field(str, False),
+        )
+
+        os = [await orm_class.create(foo=foo) for foo in range(5)]
+        for o in os[:3]:
+            o.foo += 10
+        os[3].bar = "bar"
+
+        await orm_class.update_many(os)
+        for o in os:
+            self.assertFalse(o.is_modified())
+
+        o = await orm_class.query.eq_pk(os[0].pk).one()
+        self.assertEqual(10, o.foo)
+        o = await orm_class.query.eq_pk(os[3].pk).one()
+        self.assertEqual("bar", o.bar)
+
+        # the sent fields aren't modified even if the db sends nothing back
+        for o in os:
+            o.foo += 100
+        await orm_class.update_many(os, ignore_result=True)
+        for o in os:
+            self.assertFalse(o.is_modified())
+        o = await orm_class.query.eq_pk(os[4].pk).one()
+        self.assertEqual(104, o.foo)
+
+        with self.assertRaises(ValueError):
+            await orm_class.update_many([orm_class(foo=1)])
+
+    async def test_update_many_pk_rollback(self):
+        orm_class = self.get_orm_class(
+            _id=Field(int, True, pk=True),
+            foo=Field(int, True),
+            foo_index=Index("foo", unique=True),
+        )
+        os = [await orm_class.create(_id=i, foo=i) for i in range(1, 4)]
+
+        # the pk change is its own query but it should be rolled back when
+        # the bulk update fails
+        os[0]._id = 100
+        os[1].foo = 3
+        with self.assertRaises(UniqueError):
+            await orm_class.update_many(os)
+
+        self.assertIsNotNone(await orm_class.query.eq_pk(1).one())
+        self.assertIsNone(await orm_class.query.eq_pk(100).one())
+
+    async def test_save_returning(self):
+        orm_class = self.get_orm_class()
+
+        for returning in ["pk", "modified", "none"]:
+            t = orm_class(foo=1, bar="value 1")
+            await t.save(returning=returning)
+            self.assertIsNotNone(t.pk)
+            self.assertFalse(t.is_modified())
+
+            t.foo = 2
+            await t.save(returning=returning)
+            self.assertEqual(2, t.foo)
+            self.assertFalse(t.is_modified())
+
+            t2 = await t.requery()
+            self.assertEqual(2, t2.foo)
+            self.assertEqual("value 1", t2.bar)
+
+        q = orm_class.query.set_foo(1)
+        i = q.interface
+        sql, _ = i.render_insert_sql(
+            q.schema,
+            q.fields_set.todict(),
+            returning_field_names=["_id"],
+        )
+        self.assertTrue(sql.endswith('RETURNING "_id"'))
+
+        with self.assertRaises(ValueError):
+            await orm_class(foo=1, bar="value 1").save(returning="foo")
+
+    async def test_save_many(self):
+        orm_class = self.get_orm_class(
+            foo=Field(int, True),
+            bar=Field(str, False),
+        )
+
+        os = [await orm_class.create(foo=foo) for foo in range(3)]
+        os[0].foo = 10
+        os[1].bar = "bar"
+        os.extend(orm_class(foo=foo) for foo in range(3, 6))
+
+        await orm_class.save_many(os)
+        for o in os:
+            self.assertTrue(o.pk)
+            self.assertFalse(o.is_modified())
+
+        self.assertEqual(6, await orm_class.query.count())
+        o = await orm_class.query.eq_pk(os[0].pk).one()
+        self.assertEqual(10, o.foo)
+        o = await orm_class.query.eq_pk(os[4].pk).one()
+        self.assertEqual(4, o.foo)
+
+    async def test_insert_many(self):
+        orm_class = self.get_orm_class(
+            foo=Field(int, True),
+            bar=Field(dict, False),
+        )
+
+        os = [orm_class(foo=foo, bar={"foo": foo}) for foo in range(5)]
+        await orm_class.insert_many(os)
+        for foo, o in enumerate(os):
+            o2 = await o.requery()
+            self.assertEqual(foo, o2.foo)
+            self.assertEqual({"foo": foo}, o2.bar)
+
+        # the db would set the primary keys but not send them back
+        with self.assertRaises(ValueError):
+            await orm_class.insert_many(
+                [orm_class(foo=10)],
+                ignore_result=True,
+            )
+
+        orm_class = self.get_orm_class(
+            _id=Field(int, True, pk=True),
+            foo=Field(int, True),
+        )
+        os = [orm_class(_id=pk, foo=pk) for pk in range(1, 4)]
+        await orm_class.insert_many(os, ignore_result=True)
+        for pk, o in enumerate(os, 1):
+            self.assertEqual(pk, o.pk)
+            self.assertFalse(o.is_modified())
+
+        # saving again updates the rows instead of inserting them again
+        os[0].foo = 100
+        await orm_class.save_many(os)
+        self.assertEqual(3, await orm_class.query.count())
+        self.assertEqual(100, (await os[0].requery()).foo)
+
+    async def test_upsert_many(self):
+        orm_class = self.get_orm_class(
+            foo=Field(int, True),
+            bar=Field(int, True),
+            foo_index=Index("foo", unique=True),
+        )
+
+        o = await orm_class.create(foo=1, bar=1)
+
+        os = [orm_class(foo=foo, bar=foo * 10) for foo in range(1, 4)]
+        os = await orm_class.upsert_many(os)
+        self.assertEqual(o.pk, os[0].pk)
+        for o2 in os:
+            self.assertTrue(o2.pk)
+            self.assertFalse(o2.is_modified())
+
+        o2 = await o.requery()
+        self.assertEqual(10, o2.bar)
+        self.assertEqual(3, await orm_class.query.count())
+
+    async def test_upsert_many_typed_conflict(self):
+        """the db can send back conflict values with a different type than
+        what was sent so the rows have to be matched on normalized values"""
+        orm_class = self.get_orm_class(
+            foo=Field(datetime.datetime, True),
+            bar=Field(dict, True),
+            che=Field(int, True),
+            foo_bar=Index("foo", "bar", unique=True),
+        )
+
+        dt = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+        o = await orm_class.create(foo=dt, bar={"a": 1}, che=1)
+
+        os = await orm_class.upsert_many([
+            orm_class(foo=dt, bar={"a": 1}, che=2),
+            orm_class(foo=dt, bar={"a": 2}, che=3),
+        ])
+        self.assertEqual(o.pk, os[0].pk)
+        self.assertNotEqual(o.pk, os[1].pk)
+        self.assertTrue(os[1].pk)
+        self.assertEqual(2, (await o.requery()).che)
+
     async def test_load(self):
         orm_class = self.get_orm_class(
             foo=Field(int, True),
@@ -1521,3 +1721,27 @@ class OrmsTest(EnvironTestCase):
         self.assertTrue(issubclass(rel_classes[0], Orm))
         self.assertEqual("foo_bar", rel_classes[0].model_name)
 
+    def test_get_dep_classes_add_class(self):
+        class DepFoo(Orm):
+            pass
+
+        class DepBar(Orm):
+            foo_id = Field(DepFoo, True)
+
+        orm_classes = Orm.orm_classes
+        self.assertEqual([DepBar], orm_classes.get_dep_classes(DepFoo))
+
+        class DepChe(Orm):
+            foo_id = Field(DepFoo, True)
+
+        dep_classes = orm_classes.get_dep_classes(DepFoo)
+        self.assertEqual(set([DepBar, DepChe]), set(dep_classes))
+
+        # DepBar isn't an absolute class anymore so its child should replace
+        # it as the dependency
+        class DepBarChild(DepBar):
+            pass
+
+        dep_classes = orm_classes.get_dep_classes(DepFoo)
+        self.assertEqual(set([DepBarChild, DepChe]), set(dep_classes))
+
@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
 import datetime
+import functools
 import re
 import inspect
 import random
@@ -14,11 +17,23 @@ from prom.query import (
     QueryField,
     QueryFields,
     Iterator,
+    hydrate_rows,
 )
+from prom.model import Orm
 from prom.config import Field
+from prom.exception import InterfaceError
+from prom import interface as prom_interface
 from prom.compat import *
 
 
+class HydrateOrm(Orm):
+    """The generated test orm classes can't be pickled, this one can be sent
+    to a worker process"""
+    table_name = "hydrate_orm"
+    foo = Field(int, True)
+    bar = Field(str, True)
+
+
 class QueryFieldTest(TestCase):
     def test___new__(self):
         q = self.get_query()
@@ -26,6 +41,14 @@ class QueryFieldTest(TestCase):
         self.assertEqual("foo", f.name)
         self.assertEqual("MAX", f.function_name)
 
+    def test_slots(self):
+        q = self.get_query()
+        f = QueryField(q, "foo", 1, operator="eq", clause="where", day=1)
+        self.assertEqual({"day": 1}, f.kwargs)
+        self.assertIsNone(f.alias)
+        with self.assertRaises(AttributeError):
+            f.__dict__
+
     def test_in_set_clause(self):
         q = self.get_query()
         q.set_field("foo", 1)
@@ -74,6 +97,16 @@ class QueryFieldsTest(TestCase):
         fs.append(QueryField(q, "foo", None))
         self.assertEqual(["foo", "bar"], list(fs.names()))
 
+    def test_get_field(self):
+        q = self.get_query()
+        fs = QueryFields()
+        fs.append(QueryField(q, "foo", 1))
+        fs.append(QueryField(q, "foo", 2))
+
+        self.assertEqual(2, fs.get_field("foo").value)
+        self.assertIsNone(fs.get_field("bar"))
+        self.assertFalse("bar" in fs)
+
 
 class QueryBoundsTest(TestCase):
     def test_find_more_index(self):
@@ -265,6 +298,197 @@ class QueryTest(EnvironTestCase):
         self.assertEqual(5, await orm_class.query.limit(5).count())
         self.assertEqual(10, await orm_class.query.count())
 
+    async def test_gather(self):
+        orm_class = self.get_orm_class()
+        pks = await self.insert(orm_class, 10)
+
+        count, o, os, has = await Query.gather(
+            orm_class.query.count(),
+            orm_class.query.eq_pk(pks[0]).one(),
+            orm_class.query.in_pk(pks[:3]),
+            orm_class.query.eq_pk(-1).has(),
+            concurrency=2,
+        )
+        self.assertEqual(10, count)
+        self.assertEqual(pks[0], o.pk)
+        self.assertEqual(3, len(os))
+        self.assertFalse(has)
+
+        # no Query instances so the default interface is used
+        interfaces = prom_interface.interfaces
+        default = interfaces.get("", None)
+        interfaces[""] = orm_class.interface
+        try:
+            r = await Query.gather(orm_class.query.count())
+            self.assertEqual([10], r)
+
+        finally:
+            if default:
+                interfaces[""] = default
+
+            else:
+                interfaces.pop("")
+
+        # in a transaction the queries share the transaction's connection so
+        # they run one at a time
+        running = []
+        async def one(pk):
+            running.append(pk)
+            # SQLite queries don't yield, so give the other queries a chance
+            await asyncio.sleep(0)
+            self.assertEqual(1, len(running))
+            o = await orm_class.query.eq_pk(pk).one()
+            running.remove(pk)
+            return o
+
+        async with orm_class.interface.transaction():
+            os = await Query.gather(
+                *[one(pk) for pk in pks[:4]],
+                interface=orm_class.interface,
+            )
+        self.assertEqual(pks[:4], [o.pk for o in os])
+
+        with self.assertRaises(InterfaceError):
+            await Query.gather(
+                orm_class.query.count(),
+                orm_class.query.raw("SELECT * FROM WHERE"),
+                interface=orm_class.interface,
+            )
+
+    async def test_partitioned(self):
+        orm_class = self.get_orm_class()
+        pks = await self.insert(orm_class, 20)
+
+        qs = await orm_class.query.partitions(4)
+        self.assertEqual(4, len(qs))
+        counts = [await q.count() for q in qs]
+        self.assertEqual(20, sum(counts))
+
+        qs = await orm_class.query.partitions(3, method="modulo")
+        self.assertEqual(20, sum([await q.count() for q in qs]))
+
+        rpks = [o.pk async for o in orm_class.query.partitioned(4)]
+        self.assertEqual(sorted(pks), sorted(rpks))
+
+        q = orm_class.query.in_pk(pks[:5])
+        rpks = [o.pk async for o in q.partitioned(10, queue_size=1)]
+        self.assertEqual(sorted(pks[:5]), sorted(rpks))
+
+        async for o in orm_class.query.partitioned(2, queue_size=1):
+            break
+
+        with self.assertRaises(ValueError):
+            await orm_class.query.limit(10).partitions(2)
+
+        qs = await orm_class.query.eq_pk(-1).partitions(4)
+        self.assertEqual(1, len(qs))
+
+        # in a transaction the partitions share a connection so they can't
+        # run concurrently
+        interface = orm_class.interface
+        running = []
+        get = interface.get
+        async def tracked_get(*args, **kwargs):
+            running.append(1)
+            await asyncio.sleep(0)
+            self.assertEqual(1, len(running))
+            try:
+                return await get(*args, **kwargs)
+
+            finally:
+                running.pop()
+
+        interface.get = tracked_get
+        try:
+            async with interface.transaction():
+                rpks = [o.pk async for o in orm_class.query.partitioned(4)]
+                self.assertEqual(sorted(pks), sorted(rpks))
+
+        finally:
+            del interface.get
+
+        # non-integer pks are split using row counts
+        orm_class = self.get_orm_class(
+            _id=Field(str, True, max_size=36, pk=True)
+        )
+        for i in range(9):
+            await orm_class.create(_id=f"foo{i}")
+
+        qs = await orm_class.query.partitions(3)
+        self.assertEqual([3, 3, 3], [await q.count() for q in qs])
+
+    async def test_iterator_batches(self):
+        orm_class = self.get_orm_class()
+        pks = await self.insert(orm_class, 10)
+
+        it = await orm_class.query.asc_pk().get()
+        batches = [[o.pk for o in batch] async for batch in it.batches(4)]
+        self.assertEqual([pks[0:4], pks[4:8], pks[8:]], batches)
+
+        # the extra pagination row isn't returned
+        it = await orm_class.query.select_pk().asc_pk().limit(5).get()
+        self.assertEqual([pks[:3], pks[3:5]], [b async for b in it.batches(3)])
+        self.assertTrue(await it.has_more())
+
+        it = await orm_class.query.select_pk().asc_pk().get()
+        it.filter = lambda pk: pk in pks[4:]
+        self.assertEqual(
+            [pks[4:5], pks[5:]],
+            [b async for b in it.batches(5)],
+        )
+
+    async def test_hydrate_rows(self):
+        orm_class = HydrateOrm
+        orm_class.interface = self.get_interface()
+        pks = await self.insert(orm_class, 10)
+
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(2) as executor:
+            it = await orm_class.query.asc_pk().get()
+            orms = []
+            async for rows in it.row_batches(4):
+                orms.extend(await loop.run_in_executor(
+                    executor,
+                    hydrate_rows,
+                    orm_class,
+                    it.field_names,
+                    [dict(row) for row in rows],
+                ))
+
+            self.assertEqual(pks, [o.pk for o in orms])
+            self.assertIsInstance(orms[0], orm_class)
+            self.assertIsInstance(orms[0]._created, datetime.datetime)
+            self.assertFalse(orms[0].modified_field_names)
+
+            it = await orm_class.query.select_pk().desc_pk().get()
+            rows = [dict(row) async for row in it.rows()]
+            rpks = await loop.run_in_executor(
+                executor,
+                hydrate_rows,
+                orm_class,
+                it.field_names,
+                rows,
+            )
+            self.assertEqual(list(reversed(pks)), rpks)
+
+            it = await orm_class.query.asc_pk().get()
+            rows = [dict(row) async for row in it.rows()]
+            ds = await loop.run_in_executor(
+                executor,
+                functools.partial(hydrate_rows, as_dict=True),
+                orm_class,
+                it.field_names,
+                rows,
+            )
+            self.assertEqual(pks, [d["_id"] for d in ds])
+
+        # the Iterator hydrates the same way
+        it = await orm_class.query.asc_pk().get()
+        self.assertEqual(
+            [o.fields for o in orms],
+            [o.fields async for o in it],
+        )
+
     async def test_has(self):
         q = self.get_query()
         self.assertFalse(await q.has())
@@ -456,6 +680,21 @@ class QueryTest(EnvironTestCase):
             self.assertEqual(t[1][0], r[0].__name__)
             self.assertEqual(t[1][1], r[1])
 
+    def test_find_methods_cache(self):
+        class ChildQuery(Query):
+            def eq_field(self, field_name, *args, **kwargs):
+                return "child"
+
+        q = self.get_query()
+        q2 = ChildQuery()
+
+        self.assertEqual(q, q.eq_foo(1))
+        self.assertEqual("child", q2.eq_foo(1))
+
+        fm, fn = q.find_methods("eq_foo")
+        self.assertEqual(q, fm.__self__)
+        self.assertEqual("foo", fn)
+
     async def test_like(self):
         _q = self.get_query()
         await self.insert(_q, 5)
@@ -811,6 +1050,22 @@ class QueryTest(EnvironTestCase):
         self.assertNotEqual(id(q1.fields_where), id(q2.fields_where))
         self.assertNotEqual(id(q1.bounds), id(q2.bounds))
 
+        q1.in_bar([1, 2, 3]).limit(5)
+        q2 = q1.copy()
+        q2.eq_foo(2).limit(10).fields_where[0].or_clause = True
+
+        self.assertEqual(2, len(q1.fields_where))
+        self.assertEqual(5, q1.bounds.limit)
+        self.assertFalse(q1.fields_where[0].or_clause)
+        self.assertEqual(3, len(q2.fields_where))
+
+        # field values are shared but the fields point to their own query
+        f1 = q1.fields_where.get_field("bar")
+        f2 = q2.fields_where.get_field("bar")
+        self.assertTrue(f1.value is f2.value)
+        self.assertTrue(f1.query is q1)
+        self.assertTrue(f2.query is q2)
+
     def test_or_clause(self):
         q = self.get_query()
         q.eq_foo(1).OR.gte_foo(10).OR.ne_foo(None).eq_bar(1)
@@ -1077,6 +1332,66 @@ class QueryTest(EnvironTestCase):
         foo2 = await q.copy().select("MAX(foo)").one()
         self.assertEqual(foo1, foo2)
 
+    async def test_aggregate_group_by(self):
+        orm_class = self.get_orm_class(foo=Field(int), bar=Field(str))
+        for foo, bar in [(1, "a"), (2, "a"), (2, "a"), (10, "b"), (5, "c")]:
+            await orm_class.create(foo=foo, bar=bar)
+        q = orm_class.query
+
+        rows = await q.copy().sum_foo().avg_foo().count_field().tolist()
+        self.assertEqual([[20, 4, 5]], rows)
+
+        rows = await q.copy().min_foo().max_foo().count_foo(
+            distinct=True
+        ).tolist()
+        self.assertEqual([[1, 10, 4]], rows)
+
+        rows = await q.copy().select_bar().sum_foo().group_by(
+            "bar"
+        ).asc_bar().tolist()
+        self.assertEqual([["a", 5], ["b", 10], ["c", 5]], rows)
+
+        q2 = q.copy().select_bar().count_field().group_bar().having(
+            "count(*)",
+            "gt",
+            1
+        )
+        self.assertEqual([["a", 3]], await q2.tolist())
+
+        q2 = q.copy().select_bar().group_bar().having("sum(foo)", "gte", 5)
+        self.assertEqual(["a", "b", "c"], await q2.asc_bar().tolist())
+        self.assertEqual(3, await q2.count())
+
+        sql = q.copy().sum_foo(alias="total").group_bar().render()
+        self.assertTrue('sum("foo") AS "total"' in sql)
+        self.assertTrue('GROUP BY\n  "bar"' in sql)
+
+        # aggregates can be sorted by their alias or the function syntax
+        q2 = q.copy().select_bar().sum_foo().group_bar()
+        rows = await q2.copy().desc_field("sum_foo").asc_bar().tolist()
+        self.assertEqual([["b", 10], ["a", 5], ["c", 5]], rows)
+        rows = await q2.copy().desc_field("sum(foo)").asc_bar().tolist()
+        self.assertEqual([["b", 10], ["a", 5], ["c", 5]], rows)
+
+        q2 = q.copy().select_bar().count_field().group_bar().asc_count()
+        self.assertEqual(1, (await q2.tolist())[0][1])
+
+    async def test_aggregate_min_max_types(self):
+        orm_class = self.get_orm_class(foo=Field(int))
+        for foo in [1, 2, 3]:
+            await orm_class.create(foo=foo)
+        q = orm_class.query
+
+        created = await q.copy().max_field("_created").one()
+        self.assertIsInstance(created, datetime.datetime)
+
+        lowest, highest = await q.copy().min__created().max__created().one()
+        self.assertIsInstance(lowest, datetime.datetime)
+        self.assertLessEqual(lowest, highest)
+
+        # the count of a datetime isn't a datetime
+        self.assertEqual(3, await q.copy().count_field("_created").one())
+
 
 class IteratorTest(EnvironTestCase):
     async def get_iterator(self, count=5, limit=5, page=0):